@@ -0,0 +1,264 @@
+from inventory import Inventory, ROW_TYPES
+from sort import ArrayWrapper, ResultCache, SolverStats, SortInventory, ENGINE_DFS, ENGINE_BEST_FIRST, \
+    ENGINE_ITERATIVE, PARALLEL_ROW_THRESHOLD
+from concurrent.futures import Executor, ProcessPoolExecutor
+from time import perf_counter
+import argparse
+import random
+import tracemalloc
+
+
+class Workload:
+    def __init__(self, mode: str, columns: int, rows: int, widths: tuple[int, int], fill: float, drops: int,
+                 seed: int, pool: Executor | None = None, parallel_threshold: int = PARALLEL_ROW_THRESHOLD,
+                 cache_size: int = 0):
+        """
+        The Workload describes one benchmark scenario. All random decisions are taken from a random.Random seeded
+        with the seed, so the same workload always produces the same drops.
+
+        :param mode: "solve" calls SortInventory directly on random rows, "drop" moves items around in an Inventory
+        :param columns: the width of a row
+        :param rows: the amount of rows (only used by "drop")
+        :param widths: the smallest and the largest width of an item, the widths are uniformly distributed
+        :param fill: the share of the spaces that are occupied by items
+        :param drops: the amount of drops to measure
+        :param seed: the seed of the random numbers
+        :param pool: the process pool used to sort wide rows in parallel (None to sort everything in this process)
+        :param parallel_threshold: the row length from which on the pool is used
+        :param cache_size: the amount of results kept by a ResultCache (0 disables the cache)
+        """
+        self.mode = mode
+        self.columns = columns
+        self.rows = rows
+        self.widths = widths
+        self.fill = fill
+        self.drops = drops
+        self.seed = seed
+        self.pool = pool
+        self.parallel_threshold = parallel_threshold
+        self.cache_size = cache_size
+
+    def new_cache(self) -> ResultCache | None:
+        """
+        Creates an empty ResultCache for one run of the workload.
+
+        :return: the cache, or None if the workload runs without one
+        """
+        return ResultCache(self.cache_size) if self.cache_size > 0 else None
+
+    def describe(self) -> str:
+        """
+        Creates a short text that identifies the workload.
+
+        :return: the parameters of the workload in a fixed width format
+        """
+        rows = self.rows if self.mode == "drop" else "-"
+        widths = f"{self.widths[0]}-{self.widths[1]}"
+        return f"{self.mode:<6}{self.columns:>8}{rows:>6}{widths:>8}{self.fill:>6.2f}"
+
+
+def random_item_widths(rng: random.Random, widths: tuple[int, int], spaces: int) -> list[int]:
+    """
+    Draws item widths until the next item would not fit into the given amount of spaces anymore.
+
+    :param rng: the random numbers to use
+    :param widths: the smallest and the largest width of an item
+    :param spaces: the amount of spaces the items may take in total
+    :return: the widths of the items
+    """
+    result: list[int] = []
+    total = 0
+    while True:
+        width = rng.randint(*widths)
+        if total + width > spaces:
+            return result
+        result.append(width)
+        total += width
+
+
+def random_row(rng: random.Random, columns: int, fill: float, widths: tuple[int, int]) -> list[str | None]:
+    """
+    Creates a row with randomly placed items that occupy roughly the given share of its spaces.
+
+    :param rng: the random numbers to use
+    :param columns: the width of the row
+    :param fill: the share of the spaces that should be occupied
+    :param widths: the smallest and the largest width of an item
+    :return: the row as a list of names (or None values)
+    """
+    item_widths = random_item_widths(rng, widths, int(columns * fill))
+    pieces: list[tuple[str | None, int]] = [(f"ITEM-{index}", width) for index, width in enumerate(item_widths)]
+    pieces += [(None, 1)] * (columns - sum(item_widths))
+    rng.shuffle(pieces)
+    return [name for name, width in pieces for _ in range(width)]
+
+
+def run_solves(workload: Workload, row_type: type[ArrayWrapper], engine: str, stats: SolverStats | None = None) \
+        -> list[float]:
+    """
+    Sorts a new item into random rows and measures every call of SortInventory.
+
+    :param workload: the workload to run
+    :param row_type: the ArrayWrapper implementation to use
+    :param engine: the search engine of the SortInventory
+    :param stats: collects statistics about every solve if given
+    :return: the duration of every solve in seconds
+    """
+    rng = random.Random(workload.seed)
+    cases: list[tuple[ArrayWrapper, int, int]] = []
+    while len(cases) < workload.drops:
+        row = random_row(rng, workload.columns, workload.fill, workload.widths)
+        width = rng.randint(*workload.widths)
+        if row.count(None) < width:
+            continue
+        cases.append((row_type(row), width, rng.randint(0, workload.columns - width)))
+
+    cache = workload.new_cache()
+    latencies: list[float] = []
+    for row, width, position in cases:
+        start = perf_counter()
+        SortInventory("NEW", width, position, row, engine=engine, stats=stats, pool=workload.pool,
+                      parallel_threshold=workload.parallel_threshold, cache=cache).sort_inventory()
+        latencies.append(perf_counter() - start)
+    return latencies
+
+
+def run_drops(workload: Workload, row_type: type[ArrayWrapper], engine: str, stats: SolverStats | None = None) \
+        -> list[float]:
+    """
+    Fills an Inventory with random items and measures moving random items to random positions.
+
+    :param workload: the workload to run
+    :param row_type: the ArrayWrapper implementation to use
+    :param engine: the search engine the Inventory sorts with
+    :param stats: collects statistics about every sort during the drops if given
+    :return: the duration of every drop in seconds
+    """
+    rng = random.Random(workload.seed)
+    inventory = Inventory(workload.columns, workload.rows, row_type, pool=workload.pool, cache=workload.new_cache(),
+                          engine=engine)
+    spaces = int(workload.columns * workload.rows * workload.fill)
+    for index, width in enumerate(random_item_widths(rng, workload.widths, spaces)):
+        inventory.add_item(f"ITEM-{index}", width)
+    names = sorted(inventory.positions)
+    # Filling the inventory is not part of the measurement
+    inventory.stats = stats
+
+    latencies: list[float] = []
+    for _ in range(workload.drops):
+        name = rng.choice(names)
+        width = inventory.positions[name][2]
+        grid_x = rng.randint(0, workload.columns - width)
+        grid_y = rng.randrange(workload.rows)
+        start = perf_counter()
+        inventory.move_item(name, grid_x, grid_y)
+        latencies.append(perf_counter() - start)
+    return latencies
+
+
+def percentile(values: list[float], share: float) -> float:
+    """
+    Gets the value below which the given share of the values lies.
+
+    :param values: the values, they do not have to be sorted
+    :param share: the share between 0 and 1
+    :return: the percentile of the values
+    """
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+def run_workload(workload: Workload, row_type: type[ArrayWrapper], engine: str, memory: bool,
+                 stats: SolverStats | None = None) -> str:
+    """
+    Runs the workload once for the timings and, if wanted, a second time to measure the peak memory. Tracing the
+    memory slows everything down, so the timings are taken without it.
+
+    :param workload: the workload to run
+    :param row_type: the ArrayWrapper implementation to use
+    :param engine: the search engine of the SortInventory
+    :param memory: if the peak memory should be measured
+    :param stats: collects statistics about the timed run if given
+    :return: a line with the workload and its results
+    """
+    run = run_solves if workload.mode == "solve" else run_drops
+    latencies = run(workload, row_type, engine, stats)
+    drops_per_second = len(latencies) / sum(latencies) if sum(latencies) > 0 else float("inf")
+
+    peak = "-"
+    if memory:
+        tracemalloc.start()
+        run(workload, row_type, engine)
+        peak = f"{tracemalloc.get_traced_memory()[1] / 1024:.0f}"
+        tracemalloc.stop()
+
+    return (f"{workload.describe()}{drops_per_second:>12.1f}{percentile(latencies, 0.5) * 1000:>10.3f}"
+            f"{percentile(latencies, 0.99) * 1000:>10.3f}{peak:>12}")
+
+
+def parse_list(text: str, kind: type) -> list:
+    """
+    Splits a comma separated command line argument.
+
+    :param text: the argument
+    :param kind: the type of the values
+    :return: the values of the argument
+    """
+    return [kind(value) for value in text.split(",")]
+
+
+def parse_widths(text: str) -> tuple[int, int]:
+    """
+    Parses an item width distribution given as "smallest-largest".
+
+    :param text: the distribution
+    :return: the smallest and the largest width
+    """
+    smallest, _, largest = text.partition("-")
+    return int(smallest), int(largest or smallest)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks SortInventory with seeded random workloads.")
+    parser.add_argument("--mode", choices=["solve", "drop", "both"], default="both")
+    parser.add_argument("--columns", default="10,40,200", help="comma separated row widths")
+    parser.add_argument("--rows", default="2,8", help="comma separated row counts (drop mode)")
+    parser.add_argument("--widths", default="1-3,1-6", help="comma separated item width ranges like 1-6")
+    parser.add_argument("--fill", default="0.5,0.9", help="comma separated fill ratios")
+    parser.add_argument("--drops", type=int, default=100, help="drops measured per workload")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--row-type", choices=sorted(ROW_TYPES), default="list")
+    parser.add_argument("--engine", choices=[ENGINE_DFS, ENGINE_BEST_FIRST, ENGINE_ITERATIVE], default=ENGINE_DFS,
+                        help="search engine")
+    parser.add_argument("--no-memory", action="store_true", help="skip measuring the peak memory")
+    parser.add_argument("--stats", action="store_true", help="print the solver statistics of every workload")
+    parser.add_argument("--workers", type=int, default=0, help="size of the process pool (0 disables the pool)")
+    parser.add_argument("--parallel-threshold", type=int, default=PARALLEL_ROW_THRESHOLD,
+                        help="row width from which on the pool is used (solve mode)")
+    parser.add_argument("--cache-size", type=int, default=0,
+                        help="results kept by the solver cache (0 disables the cache)")
+    args = parser.parse_args()
+    pool = ProcessPoolExecutor(args.workers) if args.workers > 0 else None
+
+    modes = ["solve", "drop"] if args.mode == "both" else [args.mode]
+    print(f"{'mode':<6}{'columns':>8}{'rows':>6}{'widths':>8}{'fill':>6}{'drops/s':>12}{'p50 ms':>10}{'p99 ms':>10}"
+          f"{'peak KiB':>12}")
+    for mode in modes:
+        for columns in parse_list(args.columns, int):
+            for rows in (parse_list(args.rows, int) if mode == "drop" else [1]):
+                for widths in parse_list(args.widths, parse_widths):
+                    for fill in parse_list(args.fill, float):
+                        workload = Workload(mode, columns, rows, widths, fill, args.drops, args.seed, pool,
+                                            args.parallel_threshold, args.cache_size)
+                        stats = SolverStats() if args.stats else None
+                        print(run_workload(workload, ROW_TYPES[args.row_type], args.engine, not args.no_memory,
+                                           stats), flush=True)
+                        if stats is not None:
+                            print("    " + " ".join(f"{name}={value:.4g}" if isinstance(value, float)
+                                                    else f"{name}={value}" for name, value in stats.as_dict().items()))
+    if pool is not None:
+        pool.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,266 @@
+from inventory import Inventory
+from main import DROP_TIME_BUDGET
+from sort import ArrayWrapper
+import tkinter as tk
+
+# The time in milliseconds between two redraws while dragging, all motion events in between are merged into one
+FRAME_MS = 16
+
+
+class CanvasDragAndDrop:
+    def __init__(self, canvas: tk.Canvas, grid: int, width: int, height: int, left_corner: tuple[int, int],
+                 row_type: type[ArrayWrapper] = ArrayWrapper, time_budget: float | None = DROP_TIME_BUDGET):
+        """
+        The CanvasDragAndDrop class offers the same interactive Inventory as the DragAndDrop class, but draws all
+        items onto a single tk.Canvas instead of placing a widget per item. While dragging only one update per frame
+        is drawn, and all items moved by a drop are moved together, so large inventories redraw smoothly.
+
+        :param canvas: the tk.Canvas to draw the items on
+        :param grid: The grids unit in pixel
+        :param width: a multiple of grid in pixel (the multiple is the amount of columns in the inventory)
+        :param height: a multiple of grid in pixel (the multiple is the amount of rows in the inventory)
+        :param left_corner: the left corner on the canvas given as (x, y) coordinates in pixel
+        :param row_type: the ArrayWrapper implementation used to store the rows of the inventory
+        :param time_budget: the time in seconds a drop may spend on sorting the inventory, if it runs out the
+                            cheapest layout found so far is used (None for no limit)
+        """
+        self.canvas = canvas
+        self.grid: int = grid
+        self.min_x, self.min_y = left_corner
+        self.inventory = Inventory(width // grid, height // grid, row_type, time_budget)
+        # The canvas tag of every item and the item of every tag, the tag marks the rectangle and the text of the item
+        self.tags: dict[str, str] = {}
+        self.names: dict[str, str] = {}
+        # The position of the left upper corner every item is currently drawn at in pixel
+        self.drawn: dict[str, list[int]] = {}
+
+        # The item that is dragged, the cursor position the drag started at and the last cursor position that was not
+        # drawn yet
+        self.dragged: str | None = None
+        self.drag_start = (0, 0)
+        self.pending: tuple[int, int] | None = None
+        self.frame_job: str | None = None
+        # The grid position the dragged item currently hovers over and the pending computation of the drop there
+        self.hovered: tuple[int, int] | None = None
+        self.idle_job: str | None = None
+
+        self.canvas.bind("<ButtonPress-1>", self.on_drag_start)
+        self.canvas.bind("<B1-Motion>", self.on_drag_motion)
+        self.canvas.bind("<ButtonRelease-1>", self.on_drag_stop)
+
+    def add_item(self, name: str, width: int, color: str, text: str = "", grid_x: int = -1, grid_y: int = -1) -> bool:
+        """
+        Places a new item into the inventory and draws it.
+
+        :param name: the unique name of the item
+        :param width: the amount of columns taken by the item
+        :param color: the fill color of the item
+        :param text: the text written on the item
+        :param grid_x: the desired column (-1 implies first free space)
+        :param grid_y: the desired row (-1 implies the first row that has enough space)
+        :return: If the item could be placed in the inventory
+        """
+        changes = self.inventory.add_item(name, width, grid_x, grid_y)
+        if changes is None:
+            return False
+        self.draw_item(name, width, color, text)
+        self.move_drawn_items(changes)
+        return True
+
+    def add_items(self, items: list[tuple[str, int, str, str, tuple[int, int] | None]]) -> list[str]:
+        """
+        Places many new items into the inventory at once and draws them.
+
+        :param items: the unique name, the width, the fill color, the text and the desired column and row (or None
+                      for any free space) of every item
+        :return: the names of the items that could not be placed in the inventory
+        """
+        changes, failed = self.inventory.add_items([(name, width, position) for name, width, _, _, position in items])
+        not_placed = set(failed)
+        for name, width, color, text, _ in items:
+            if name not in not_placed:
+                self.draw_item(name, width, color, text)
+        self.move_drawn_items(changes)
+        return failed
+
+    def draw_item(self, name: str, width: int, color: str, text: str) -> None:
+        """
+        Draws a new item in the left upper corner of the inventory, from where it is moved to its position.
+
+        :param name: the unique name of the item
+        :param width: the amount of columns taken by the item
+        :param color: the fill color of the item
+        :param text: the text written on the item
+        """
+        # Names may contain spaces, which tags can not, so every item gets a numbered tag
+        tag = f"item{len(self.tags)}"
+        self.tags[name] = tag
+        self.names[tag] = name
+        self.canvas.create_rectangle(self.min_x, self.min_y, self.min_x + width * self.grid, self.min_y + self.grid,
+                                     fill=color, tags=(tag,))
+        self.canvas.create_text(self.min_x + width * self.grid // 2, self.min_y + self.grid // 2, text=text,
+                                font=("Arial", 10), tags=(tag,))
+        self.drawn[name] = [self.min_x, self.min_y]
+
+    def move_drawn_items(self, changes: dict[str, tuple[int, int]]) -> None:
+        """
+        Moves the drawings of all given items to their new positions at once, the canvas redraws them together.
+
+        :param changes: the items that have been placed or moved with their new column and row
+        """
+        for changed_item_name, (column, row) in changes.items():
+            self.move_drawing(changed_item_name, (column * self.grid) + self.min_x, (row * self.grid) + self.min_y)
+
+    def move_drawing(self, name: str, x: int, y: int) -> None:
+        """
+        Moves the drawing of the item so that its left upper corner is at the given position.
+
+        :param name: the name of the item
+        :param x: the new x position in pixel
+        :param y: the new y position in pixel
+        """
+        old_x, old_y = self.drawn[name]
+        if (x, y) != (old_x, old_y):
+            self.canvas.move(self.tags[name], x - old_x, y - old_y)
+            self.drawn[name] = [x, y]
+
+    def on_drag_start(self, event) -> None:
+        """
+        Notes the item under the cursor as the dragged item and raises it to the front.
+        """
+        found = self.canvas.find_withtag("current")
+        if not found:
+            return
+        tags = [tag for tag in self.canvas.gettags(found[0]) if tag in self.names]
+        if not tags:
+            return
+        self.dragged = self.names[tags[0]]
+        self.drag_start = (event.x, event.y)
+        self.canvas.tag_raise(tags[0])
+
+    def on_drag_motion(self, event) -> None:
+        """
+        Notes the new cursor position while dragging, it is drawn with the next frame.
+        """
+        if self.dragged is None:
+            return
+        self.pending = (event.x, event.y)
+        if self.frame_job is None:
+            self.frame_job = self.canvas.after(FRAME_MS, self.draw_frame)
+
+    def draw_frame(self) -> None:
+        """
+        Draws the dragged item at the last noted cursor position.
+        """
+        self.frame_job = None
+        if self.dragged is None or self.pending is None:
+            return
+        x, y = self.dragged_position(*self.pending)
+        self.move_drawing(self.dragged, x, y)
+        self.pending = None
+
+        # Once the item hovers over a new grid position, the drop there is computed ahead of time as soon as the UI
+        # is idle
+        target = self.grid_position(x, y, self.inventory.positions[self.dragged][2])
+        if target is not None and target != self.hovered:
+            self.hovered = target
+            if self.idle_job is not None:
+                self.canvas.after_cancel(self.idle_job)
+            self.idle_job = self.canvas.after_idle(self.speculate, self.dragged, *target)
+
+    def speculate(self, name: str, grid_x: int, grid_y: int) -> None:
+        """
+        Computes the drop of the dragged item at the given position without changing the inventory, and outlines
+        where the other items would be moved to.
+
+        :param name: the name of the dragged item
+        :param grid_x: the column the item hovers over
+        :param grid_y: the row the item hovers over
+        """
+        self.idle_job = None
+        self.canvas.delete("preview")
+        changes = self.inventory.preview_move(name, grid_x, grid_y)
+        if changes is None:
+            return
+        for changed_item_name, (column, row) in changes.items():
+            if changed_item_name == name:
+                continue
+            x = (column * self.grid) + self.min_x
+            y = (row * self.grid) + self.min_y
+            width = self.inventory.positions[changed_item_name][2] * self.grid
+            self.canvas.create_rectangle(x, y, x + width, y + self.grid, outline="gray40", dash=(4, 2),
+                                         tags=("preview",))
+
+    def grid_position(self, x: int, y: int, width: int) -> tuple[int, int] | None:
+        """
+        Calculates the grid position an item at the given position would be dropped at.
+
+        :param x: the x position of the left upper corner of the item in pixel
+        :param y: the y position of the left upper corner of the item in pixel
+        :param width: the amount of columns taken by the item
+        :return: the column and the row, or None if the item is out of bounds
+        """
+        grid_x = (x - self.min_x + self.grid // 2) // self.grid
+        grid_y = (y - self.min_y + self.grid // 2) // self.grid
+        if not self.inventory.in_bounds(grid_x, grid_y, width):
+            return None
+        return grid_x, grid_y
+
+    def dragged_position(self, cursor_x: int, cursor_y: int) -> tuple[int, int]:
+        """
+        Calculates where the left upper corner of the dragged item is for the given cursor position.
+
+        :param cursor_x: the x position of the cursor in pixel
+        :param cursor_y: the y position of the cursor in pixel
+        :return: the x and y position of the dragged item in pixel
+        """
+        column, row, _ = self.inventory.positions[self.dragged]
+        return ((column * self.grid) + self.min_x + cursor_x - self.drag_start[0],
+                (row * self.grid) + self.min_y + cursor_y - self.drag_start[1])
+
+    def on_drag_stop(self, event) -> None:
+        """
+        Positions the item to the new grid. The placement tries to insert the object at the desired position, and uses
+        the insertion algorithm for that, if that fails the object is returned to the original position.
+        If the item is dragged out of bounds it is always returned to its original position.
+        """
+        if self.dragged is None:
+            return
+        for job in (self.frame_job, self.idle_job):
+            if job is not None:
+                self.canvas.after_cancel(job)
+        self.frame_job = self.idle_job = None
+        self.pending = self.hovered = None
+        self.canvas.delete("preview")
+        name = self.dragged
+        x, y = self.dragged_position(event.x, event.y)
+        self.dragged = None
+
+        old_x, old_y, width = self.inventory.positions[name]
+        target = self.grid_position(x, y, width)
+        changes = self.inventory.move_item(name, *target) if target is not None else None
+        if changes is None:
+            changes = {name: (old_x, old_y)}
+        self.move_drawn_items(changes)
+        self.inventory.end_drag()
+
+
+def main():
+    root = tk.Tk()
+    root.geometry("1200x600")
+    root.title("Canvas Drag and Drop Example")
+    canvas = tk.Canvas(root, width=1200, height=600, bg="white")
+    canvas.pack()
+    dnd = CanvasDragAndDrop(canvas, 50, 1000, 400, (100, 100))
+
+    colors = ["antiquewhite", "aqua", "aquamarine1", "beige", "bisque1", "burlywood1", "cadetblue1",
+              "chartreuse", "crimson", "chocolate1", "darksalmon", "deepskyblue"]
+    widths = [2, 3, 3, 4, 2, 1, 1, 2, 1]
+    dnd.add_items([(f"ITEM-{counter}-{width}", width, colors[counter % len(colors)], f"Item {counter}", None)
+                   for counter, width in enumerate(widths * 16, start=1)])
+
+    root.mainloop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,551 @@
+from journal import Delta, Journal
+from sort import ArrayWrapper, CodedArrayWrapper, IntervalArrayWrapper, MaxSegmentTree, ResultCache, RowGrid, \
+    SolverStats, SortInventory, ENGINE_DFS
+from concurrent.futures import Executor
+from itertools import product
+from time import perf_counter
+
+# The amount of cheapest rows considered for every item that has to leave its row
+EVICTION_CANDIDATES = 3
+# Up to this amount of items that have to leave their row every combination of their candidate rows is tried, for more
+# items every item simply goes to its cheapest row
+EXACT_EVICTION_LIMIT = 4
+
+# The ArrayWrapper implementations that can store the rows of an Inventory by the name they are chosen with
+ROW_TYPES: dict[str, type[ArrayWrapper]] = {
+    "list": ArrayWrapper,
+    "coded": CodedArrayWrapper,
+    "interval": IntervalArrayWrapper,
+}
+
+
+class Inventory:
+    def __init__(self, columns: int, rows: int, row_type: type[ArrayWrapper] = ArrayWrapper,
+                 time_budget: float | None = None, stats: SolverStats | None = None, pool: Executor | None = None,
+                 cache: ResultCache | None = None, journal: Journal | None = None, engine: str = ENGINE_DFS):
+        """
+        The Inventory class holds the placement logic of an inventory of items without any user interface. All
+        positions are given in grid units, a position is the column the item starts at and its row.
+
+        :param columns: the amount of columns in the inventory
+        :param rows: the amount of rows in the inventory
+        :param row_type: the ArrayWrapper implementation used to store the rows of the inventory
+        :param time_budget: the time in seconds a single add or move may spend on sorting the inventory, if it runs
+                            out the cheapest layout found so far is used (None for no limit)
+        :param stats: collects statistics about every sort of the inventory if given
+        :param pool: a process pool that sorts wide rows in parallel (None to sort everything in this process)
+        :param cache: remembers the results of earlier sorts, so repeated drops skip the search (None to always sort)
+        :param journal: records every operation, so it can be undone and redone (None to record nothing)
+        :param engine: the search used to sort the rows, either ENGINE_DFS, ENGINE_BEST_FIRST or ENGINE_ITERATIVE
+        """
+        self.columns = columns
+        self.rows = rows
+        self.time_budget = time_budget
+        self.stats = stats
+        self.pool = pool
+        self.cache = cache
+        self.journal = journal
+        self.engine = engine
+        first_row = row_type([None for _ in range(self.columns)])
+        self.grid_occupancy = RowGrid([first_row] + [first_row.blank() for _ in range(self.rows - 1)])
+        # Every item with its starting column, its row and its width
+        self.positions: dict[str, list[int]] = {}
+        # The moves computed ahead of time while an item is dragged by their row, column and item (None if the move is
+        # not possible), they are only valid as long as the inventory does not change
+        self.speculations: dict[tuple[int, int, str], tuple[RowGrid, list[tuple[dict[str, int], int]]] | None] = {}
+        # The amount of free spaces of every row and the length of the longest stretch of free spaces of every row,
+        # the stretches of the rows in changed_rows are recalculated before they are needed
+        self.free_spaces = MaxSegmentTree([self.columns for _ in range(self.rows)])
+        self.free_runs = MaxSegmentTree([self.columns for _ in range(self.rows)])
+        self.changed_rows: set[int] = set()
+
+    def add_item(self, name: str, width: int, grid_x: int = -1, grid_y: int = -1) -> dict[str, tuple[int, int]] | None:
+        """
+        Places a new item into the inventory.
+
+        :param name: the unique name of the item
+        :param width: the amount of columns taken by the item
+        :param grid_x: the desired column (-1 implies first free space)
+        :param grid_y: the desired row (-1 implies the first row that has a free stretch wide enough for the item, or
+                       if there is none the first row that has enough free spaces)
+        :return: the items that have been placed or moved with their new column and row, or None if the item could
+                 not be placed
+        """
+        self.speculations.clear()
+        deadline = self.deadline()
+        if grid_y < 0:
+            # An item that fits into a free stretch of a row is put there without sorting anything
+            self.update_free_runs()
+            temp_y = self.free_runs.first_at_least(width)
+            if temp_y >= 0:
+                return self.finish(self.place_free(name, width, self.grid_occupancy[temp_y].first_free_run(width),
+                                                   temp_y))
+
+            temp_y = self.free_spaces.first_at_least(width)
+            if temp_y < 0:
+                return None
+            _, changes = self.grid_occupancy.writable(temp_y).insert_and_return_changes(
+                name, width, -1, time_budget=self.remaining_time(deadline), **self.solver_options())
+            return self.finish(self.apply_changes({name: width}, changes, temp_y))
+
+        success, changes = self.grid_occupancy.writable(grid_y).insert_and_return_changes(
+            name, width, grid_x, time_budget=self.remaining_time(deadline), **self.solver_options())
+        if not success:
+            return None
+        return self.finish(self.apply_changes({name: width}, changes, grid_y))
+
+    def add_items(self, items: list[tuple[str, int, tuple[int, int] | None]]) \
+            -> tuple[dict[str, tuple[int, int]], list[str]]:
+        """
+        Places many new items into the inventory at once, for example to restore a saved inventory. Items with a
+        preferred position are put there if it is free. The other items are packed first fit decreasing, the widest
+        item first and every item into the first free stretch it fits into. Only the items that fit into no free
+        stretch are sorted into the first row with enough free spaces, once everything else is placed.
+
+        :param items: the unique name, the width and the preferred column and row (or None) of every item
+        :return: every item that has been placed or moved with its final column and row, and the names of the items
+                 that could not be placed
+        """
+        self.speculations.clear()
+        placed: dict[str, tuple[int, int]] = {}
+        remaining: list[tuple[str, int]] = []
+        for name, width, position in items:
+            if position is not None:
+                grid_x, grid_y = position
+                if self.in_bounds(grid_x, grid_y, width) and self.grid_occupancy[grid_y].all_free(name, width, grid_x):
+                    placed.update(self.place_free(name, width, grid_x, grid_y))
+                    continue
+            remaining.append((name, width))
+
+        too_wide: list[tuple[str, int]] = []
+        for name, width in sorted(remaining, key=lambda item: -item[1]):
+            self.update_free_runs()
+            grid_y = self.free_runs.first_at_least(width)
+            if grid_y < 0:
+                too_wide.append((name, width))
+                continue
+            placed.update(self.place_free(name, width, self.grid_occupancy[grid_y].first_free_run(width), grid_y))
+
+        failed: list[str] = []
+        for name, width in too_wide:
+            grid_y = self.free_spaces.first_at_least(width)
+            if grid_y < 0:
+                failed.append(name)
+                continue
+            _, changes = self.grid_occupancy.writable(grid_y).insert_and_return_changes(
+                name, width, -1, time_budget=self.remaining_time(self.deadline()), **self.solver_options())
+            placed.update(self.apply_changes({name: width}, changes, grid_y))
+        return self.finish(placed), failed
+
+    def place_free(self, name: str, width: int, grid_x: int, grid_y: int) -> dict[str, tuple[int, int]]:
+        """
+        Places a new item onto free spaces, nothing has to be moved for that.
+
+        :param name: the unique name of the item
+        :param width: the amount of columns taken by the item
+        :param grid_x: the starting column, the spaces taken by the item have to be free
+        :param grid_y: the row
+        :return: the item with its column and row
+        """
+        self.grid_occupancy.writable(grid_y).add_item(name, width, grid_x)
+        return self.apply_changes({name: width}, {name: grid_x}, grid_y)
+
+    def remove_item(self, name: str) -> bool:
+        """
+        Takes an item out of the inventory, the other items stay where they are.
+
+        :param name: the name of the item
+        :return: If the item was in the inventory
+        """
+        if name not in self.positions:
+            return False
+        self.speculations.clear()
+        grid_x, grid_y, width = self.positions.pop(name)
+        self.grid_occupancy.writable(grid_y).remove_item(name)
+        self.free_spaces[grid_y] += width
+        self.changed_rows.add(grid_y)
+        if self.journal is not None:
+            self.journal.note(name, width, (grid_x, grid_y), None)
+        self.finish({})
+        return True
+
+    def move_item(self, name: str, grid_x: int, grid_y: int) -> dict[str, tuple[int, int]] | None:
+        """
+        Tries to move the item to the given position, by trying multiple things in order. If nothing works the
+        inventory stays as it is. A move that was already computed by preview_move() is taken from there.
+
+        :param name: the name of the item to move
+        :param grid_x: the desired column
+        :param grid_y: the desired row
+        :return: the items that have been moved with their new column and row, or None if the item could not be
+                 placed
+        """
+        key = (grid_y, grid_x, name)
+        plan = self.speculations[key] if key in self.speculations else self.plan_move(name, grid_x, grid_y)
+        self.speculations.clear()
+        if plan is None:
+            return None
+
+        result_occupation, change_sets = plan
+        moved: dict[str, tuple[int, int]] = {}
+        for changes, row in change_sets:
+            moved.update(self.apply_changes({}, changes, row))
+        self.grid_occupancy = result_occupation
+        return self.finish(moved)
+
+    def preview_move(self, name: str, grid_x: int, grid_y: int) -> dict[str, tuple[int, int]] | None:
+        """
+        Computes what moving the item to the given position would change without changing the inventory, for example
+        while the item is still being dragged. The result is kept until the inventory changes or end_drag() is called,
+        so moving the item there afterwards does not have to compute it again.
+
+        :param name: the name of the item to move
+        :param grid_x: the desired column
+        :param grid_y: the desired row
+        :return: the items that would be moved with their new column and row, or None if the item could not be placed
+        """
+        key = (grid_y, grid_x, name)
+        if key not in self.speculations:
+            self.speculations[key] = self.plan_move(name, grid_x, grid_y)
+        plan = self.speculations[key]
+        if plan is None:
+            return None
+
+        moved: dict[str, tuple[int, int]] = {}
+        for changes, row in plan[1]:
+            moved.update({changed_item_name: (position, row) for changed_item_name, position in changes.items()})
+        return moved
+
+    def cheapest_spot(self, name: str, width: int, grid_y: int = -1) -> tuple[int, int] | None:
+        """
+        Searches the position an item can be dropped at with the lowest costs, without changing the inventory. Only
+        the costs of every position are calculated, the rows are not sorted. An item that is already in the inventory
+        is left out of its row, so its current position is one of the cheapest. With a time budget every position
+        gets the same share of what is left of it, a position whose search ran out of time is ranked by the costs
+        found so far, which may be higher than the lowest possible ones.
+
+        :param name: the name of the item
+        :param width: the amount of columns taken by the item
+        :param grid_y: the row to search in (-1 implies every row)
+        :return: the column and the row of the cheapest position, the closest to the current position of the item
+                 if multiple positions are equally cheap, or None if the item fits nowhere without removing items
+        """
+        deadline = self.deadline()
+        old_x, old_y, _ = self.positions.get(name, (0, -1, width))
+        rows = [row for row in (range(self.rows) if grid_y == -1 else [grid_y])
+                if row == old_y or self.free_spaces[row] >= width]
+        columns = self.columns - width + 1
+        positions_left = len(rows) * columns
+        best: tuple[tuple[int, bool, int, int], int, int] | None = None
+        for row in rows:
+            arr = self.grid_occupancy[row]
+            if row == old_y:
+                arr = arr.copy()
+                arr.remove_item(name)
+            for column in range(columns):
+                time_budget = self.remaining_time(deadline) / positions_left if deadline is not None else None
+                positions_left -= 1
+                success, cost, _, proven = arr.placement_cost(name, width, column, time_budget=time_budget,
+                                                              **self.solver_options())
+                if not success:
+                    positions_left -= columns - column - 1
+                    break
+                # Equal costs that are proven to be the lowest possible are preferred over the costs found so far
+                key = (cost, not proven, abs(row - old_y) if old_y >= 0 else 0, abs(column - old_x))
+                if best is None or key < best[0]:
+                    best = key, column, row
+        return (best[1], best[2]) if best is not None else None
+
+    def end_drag(self) -> None:
+        """
+        Forgets all moves computed by preview_move().
+        """
+        self.speculations.clear()
+
+    def plan_move(self, name: str, grid_x: int, grid_y: int) \
+            -> tuple[RowGrid, list[tuple[dict[str, int], int]]] | None:
+        """
+        Computes the rows of the inventory after moving the item to the given position, by trying multiple things in
+        order. The inventory itself is not changed.
+
+        :param name: the name of the item to move
+        :param grid_x: the desired column
+        :param grid_y: the desired row
+        :return: the new rows and the changed items of every changed row with their new starting column in the order
+                 the changes were made, or None if the item could not be placed
+        """
+        old_x, old_y, width = self.positions[name]
+        deadline = self.deadline()
+
+        # Only the rows that are written to get copied
+        result_occupation = self.grid_occupancy.copy()
+        result_occupation.writable(old_y).remove_item(name)
+        # First tries to insert without removing any items from the targeted row
+        success, changes = result_occupation.writable(grid_y).insert_and_return_changes(
+            name, width, grid_x, time_budget=self.remaining_time(deadline), **self.solver_options())
+        if success:
+            return result_occupation, [(changes, grid_y)]
+
+        # If that fails tries to see if removing underlying items and putting them into other rows would be possible
+        items, _ = result_occupation.writable(grid_y).remove_items_under_new_item(width, grid_x)
+        free_spaces = {old_y: self.free_spaces[old_y] + width}
+        plan = self.plan_eviction(result_occupation, items, grid_y, free_spaces, deadline)
+        if plan is None:
+            return None
+
+        change_sets: list[tuple[dict[str, int], int]] = []
+        for row, arr, changes in plan:
+            result_occupation.writable(row).adopt(arr)
+            change_sets.append((changes, row))
+
+        _, changes = result_occupation.writable(grid_y).insert_and_return_changes(
+            name, width, grid_x, time_budget=self.remaining_time(deadline), **self.solver_options())
+        change_sets.append((changes, grid_y))
+        return result_occupation, change_sets
+
+    def plan_eviction(self, grid: RowGrid, items: dict[str, int], grid_y: int, free_spaces: dict[int, int],
+                      deadline: float | None) -> list[tuple[int, ArrayWrapper, dict[str, int]]] | None:
+        """
+        Finds the rows the items removed from the given row are moved to, so that the costs of all these moves
+        together are as low as possible. The costs of an item in a row are the costs of sorting it in at its current
+        column plus 2 for every row it moves. First the cheapest rows of every item are searched on the unchanged
+        rows, then every combination of these rows is tried, only rows getting more than one item have to be sorted
+        again.
+
+        :param grid: the rows of the inventory, they are not modified
+        :param items: the removed items with their width
+        :param grid_y: the row the items were removed from
+        :param free_spaces: the amount of free spaces of the rows where it differs from the free space index
+        :param deadline: the point in time (from perf_counter) the operation has to be finished by, None for no limit
+        :return: every row that gets items with its new content and its changed items with their new starting column
+                 (a row getting multiple items is listed once per item), or None if the items do not fit anywhere
+        """
+        names = sorted(items, key=lambda name: -items[name])
+        limit = EVICTION_CANDIDATES if len(names) <= EXACT_EVICTION_LIMIT else 1
+        candidates: list[list[tuple[int, int, ArrayWrapper, dict[str, int]]]] = []
+        for name in names:
+            rows = self.cheapest_rows(grid, name, items[name], grid_y, free_spaces, limit, deadline)
+            if not rows:
+                return None
+            candidates.append(rows)
+
+        best: tuple[int, list[tuple[int, ArrayWrapper, dict[str, int]]]] | None = None
+        # The results of sorting further items into a row that already got items in the same combination
+        sorted_rows: dict[tuple[int, tuple[str, ...]], tuple[int, ArrayWrapper, dict[str, int]] | None] = {}
+        for combination in product(*candidates):
+            total = 0
+            plan: list[tuple[int, ArrayWrapper, dict[str, int]]] = []
+            current: dict[int, tuple[ArrayWrapper, tuple[str, ...]]] = {}
+            for name, (cost, row, arr, changes) in zip(names, combination):
+                if row in current:
+                    previous_arr, previous_names = current[row]
+                    key = (row, previous_names + (name,))
+                    if key not in sorted_rows:
+                        sorted_rows[key] = self.placement(previous_arr, name, items[name], grid_y, row, deadline) \
+                            if previous_arr.free_spaces() >= items[name] else None
+                    if sorted_rows[key] is None:
+                        break
+                    cost, arr, changes = sorted_rows[key]
+                    current[row] = arr, key[1]
+                else:
+                    current[row] = arr, (name,)
+                total += cost
+                plan.append((row, arr, changes))
+            else:
+                if best is None or total < best[0]:
+                    best = total, plan
+        return best[1] if best is not None else None
+
+    def cheapest_rows(self, grid: RowGrid, name: str, width: int, grid_y: int, free_spaces: dict[int, int],
+                      limit: int, deadline: float | None) -> list[tuple[int, int, ArrayWrapper, dict[str, int]]]:
+        """
+        Searches the rows an item removed from the given row could be moved to most cheaply. The rows are visited in
+        the order of their distance to the given row and only rows with enough free spaces are sorted, so once the
+        distance alone costs more than the found rows the search stops.
+
+        :param grid: the rows of the inventory, they are not modified
+        :param name: the name of the item
+        :param width: the width of the item
+        :param grid_y: the row the item was removed from
+        :param free_spaces: the amount of free spaces of the rows where it differs from the free space index
+        :param limit: the amount of rows to find
+        :param deadline: the point in time (from perf_counter) the operation has to be finished by, None for no limit
+        :return: the costs, the row, the new content of the row and its changed items with their new starting column
+                 for the cheapest rows, cheapest first
+        """
+        found: list[tuple[int, int, ArrayWrapper, dict[str, int]]] = []
+        for distance in range(1, self.rows):
+            if len(found) >= limit and 2 * distance >= found[-1][0]:
+                break
+            for row in (grid_y - distance, grid_y + distance):
+                if not 0 <= row < self.rows or free_spaces.get(row, self.free_spaces[row]) < width:
+                    continue
+                cost, arr, changes = self.placement(grid[row], name, width, grid_y, row, deadline)
+                found.append((cost, row, arr, changes))
+                found.sort(key=lambda entry: entry[:2])
+                del found[limit:]
+        return found
+
+    def placement(self, arr: ArrayWrapper, name: str, width: int, grid_y: int, row: int, deadline: float | None) \
+            -> tuple[int, ArrayWrapper, dict[str, int]]:
+        """
+        Sorts an item removed from the given row into another row at its current column.
+
+        :param arr: the content of the other row, it has to have enough free spaces for the item and is not modified
+        :param name: the name of the item
+        :param width: the width of the item
+        :param grid_y: the row the item was removed from
+        :param row: the index of the other row
+        :param deadline: the point in time (from perf_counter) the operation has to be finished by, None for no limit
+        :return: the costs including 2 for every row the item moves, the new content of the row and its changed items
+                 with their new starting column
+        """
+        grid_x = min(self.positions[name][0], self.columns - width)
+        solver = SortInventory(name, width, grid_x, arr, **self.solver_options())
+        new_arr, changes = solver.sort_inventory_with_changes(self.remaining_time(deadline))
+        return solver.cost + 2 * abs(row - grid_y), new_arr, changes
+
+    def apply_changes(self, new_items: dict[str, int], changes: dict[str, int], grid_y: int) \
+            -> dict[str, tuple[int, int]]:
+        """
+        Notes the new positions of the changed items of a row.
+
+        :param new_items: the items that are new to the inventory with their width
+        :param changes: the changed items of the row with their new starting column
+        :param grid_y: the row the changes were made in
+        :return: the changed items with their new column and row
+        """
+        for changed_item_name, position in changes.items():
+            if changed_item_name in new_items:
+                width = new_items[changed_item_name]
+            else:
+                _, old_y, width = self.positions[changed_item_name]
+                self.free_spaces[old_y] += width
+                self.changed_rows.add(old_y)
+            self.free_spaces[grid_y] -= width
+            self.changed_rows.add(grid_y)
+            if self.journal is not None:
+                old = self.positions.get(changed_item_name)
+                self.journal.note(changed_item_name, width, (old[0], old[1]) if old is not None else None,
+                                  (position, grid_y))
+            self.positions[changed_item_name] = [position, grid_y, width]
+        return {changed_item_name: (position, grid_y) for changed_item_name, position in changes.items()}
+
+    def finish(self, moved: dict[str, tuple[int, int]]) -> dict[str, tuple[int, int]]:
+        """
+        Finishes an operation by recording it in the journal.
+
+        :param moved: the items the operation has placed or moved with their new column and row
+        :return: the same items
+        """
+        if self.journal is not None:
+            self.journal.commit()
+        return moved
+
+    def undo(self) -> dict[str, tuple[int, int] | None] | None:
+        """
+        Reverts the last operation recorded in the journal.
+
+        :return: the items that have been moved back with their column and row (None for items that have been taken
+                 out of the inventory), or None if there is nothing to undo
+        """
+        if self.journal is None or not self.journal.can_undo():
+            return None
+        return self.apply_delta([(name, width, new, old) for name, width, old, new in self.journal.undo()])
+
+    def redo(self) -> dict[str, tuple[int, int] | None] | None:
+        """
+        Repeats the last operation reverted by undo().
+
+        :return: the items that have been moved again with their column and row (None for items that have been taken
+                 out of the inventory), or None if there is nothing to redo
+        """
+        if self.journal is None or not self.journal.can_redo():
+            return None
+        return self.apply_delta(self.journal.redo())
+
+    def replay(self, journal: Journal) -> dict[str, tuple[int, int] | None]:
+        """
+        Rebuilds the state recorded in a journal on this inventory, which has to be empty and of the same size. The
+        items are placed at their recorded positions without sorting anything. The journal is taken over, so the
+        replayed operations can be undone afterwards.
+
+        :param journal: the journal to replay
+        :return: every item with its column and row
+        """
+        moved = self.apply_delta(journal.restore_entry())
+        for entry in journal.entries[:journal.applied]:
+            moved.update(self.apply_delta(entry))
+        self.journal = journal
+        return moved
+
+    def apply_delta(self, deltas: list[Delta] | tuple[Delta, ...]) -> dict[str, tuple[int, int] | None]:
+        """
+        Moves the items of a recorded operation from their old to their new position. All items are taken out first,
+        so items can swap places. Nothing is recorded in the journal.
+
+        :param deltas: the changed items with their width and their old and new column and row
+        :return: the changed items with their new column and row (None for items that are taken out of the inventory)
+        """
+        self.speculations.clear()
+        for name, width, old, _ in deltas:
+            if old is not None:
+                self.grid_occupancy.writable(old[1]).remove_item(name)
+                self.free_spaces[old[1]] += width
+                self.changed_rows.add(old[1])
+                del self.positions[name]
+        for name, width, _, new in deltas:
+            if new is not None:
+                self.grid_occupancy.writable(new[1]).add_item(name, width, new[0])
+                self.free_spaces[new[1]] -= width
+                self.changed_rows.add(new[1])
+                self.positions[name] = [new[0], new[1], width]
+        return {name: new for name, _, _, new in deltas}
+
+    def update_free_runs(self) -> None:
+        """
+        Recalculates the longest stretch of free spaces of every row that has changed since the last update.
+        """
+        for row in self.changed_rows:
+            self.free_runs[row] = self.grid_occupancy[row].largest_free_run()
+        self.changed_rows.clear()
+
+    def in_bounds(self, grid_x: int, grid_y: int, width: int) -> bool:
+        """
+        Checks if an item of the given width fits into the inventory at the given position.
+
+        :param grid_x: the starting column of the item
+        :param grid_y: the row of the item
+        :param width: the amount of columns taken by the item
+        :return: If the item lies completely inside the inventory
+        """
+        return 0 <= grid_x and grid_x + width <= self.columns and 0 <= grid_y < self.rows
+
+    def solver_options(self) -> dict:
+        """
+        Gets the settings every sort of the inventory is carried out with, so they are passed on by name in one place
+        instead of by their position at every call.
+
+        :return: the statistics, the process pool, the cache and the engine by the name of their parameter
+        """
+        return {"stats": self.stats, "pool": self.pool, "cache": self.cache, "engine": self.engine}
+
+    def deadline(self) -> float | None:
+        """
+        Calculates the point in time the current operation has to be finished by.
+
+        :return: the deadline (from perf_counter), or None for no limit
+        """
+        return perf_counter() + self.time_budget if self.time_budget is not None else None
+
+    @staticmethod
+    def remaining_time(deadline: float | None) -> float | None:
+        """
+        Calculates how much of the time budget of the current operation is left.
+
+        :param deadline: the point in time (from perf_counter) the operation has to be finished by, None for no limit
+        :return: the seconds left until the deadline (at least 0), or None for no limit
+        """
+        if deadline is None:
+            return None
+        return max(0.0, deadline - perf_counter())
@@ -0,0 +1,128 @@
+# The amount of operations that can be undone, older operations are folded into the checkpoint
+JOURNAL_HISTORY = 100
+# The amount of operations recorded between two compactions of the journal
+JOURNAL_CHECKPOINT_INTERVAL = 50
+
+# A change of a single item in an operation: its name, its width and its column and row before and after the operation
+# (None while the item is not in the inventory)
+Delta = tuple[str, int, tuple[int, int] | None, tuple[int, int] | None]
+
+
+class Journal:
+    def __init__(self, positions: dict[str, list[int]] | None = None, history: int = JOURNAL_HISTORY,
+                 checkpoint_interval: int = JOURNAL_CHECKPOINT_INTERVAL):
+        """
+        The Journal records every operation on an Inventory as the items it changed with their position before and
+        after the operation, so operations can be undone, redone and replayed without keeping copies of the rows. The
+        oldest operations are regularly folded into a checkpoint of the item positions, so the journal stays
+        proportional to the amount of items instead of growing with every operation.
+
+        :param positions: every item already in the inventory with its starting column, its row and its width, they
+                          make up the first checkpoint
+        :param history: the amount of operations that can be undone
+        :param checkpoint_interval: the amount of operations recorded between two compactions
+        """
+        self.history = history
+        self.checkpoint_interval = checkpoint_interval
+        # Every item with its starting column, its row and its width before the first recorded operation
+        self.checkpoint: dict[str, tuple[int, int, int]] = {name: (column, row, width) for name, (column, row, width)
+                                                           in (positions or {}).items()}
+        self.entries: list[tuple[Delta, ...]] = []
+        # The amount of entries that are applied, the entries after it have been undone and can be redone
+        self.applied = 0
+        # The changes of the running operation by item, they become an entry once the operation is finished
+        self.pending: dict[str, Delta] = {}
+        self.since_compaction = 0
+
+    def __len__(self) -> int:
+        """
+        Calls the len function on the recorded operations.
+
+        :return: the amount of operations after the checkpoint, including the undone ones
+        """
+        return len(self.entries)
+
+    def note(self, name: str, width: int, old: tuple[int, int] | None, new: tuple[int, int] | None) -> None:
+        """
+        Notes a change of an item in the running operation. An item changed multiple times keeps its position from
+        before the operation.
+
+        :param name: the name of the item
+        :param width: the width of the item
+        :param old: the column and the row of the item before the change (None if it was not in the inventory)
+        :param new: the column and the row of the item after the change (None if it left the inventory)
+        """
+        recorded = self.pending.get(name)
+        self.pending[name] = name, width, old if recorded is None else recorded[2], new
+
+    def commit(self) -> None:
+        """
+        Finishes the running operation. Operations that were undone can not be redone anymore after a new operation.
+        """
+        entry = tuple(delta for delta in self.pending.values() if delta[2] != delta[3])
+        self.pending.clear()
+        if not entry:
+            return
+        del self.entries[self.applied:]
+        self.entries.append(entry)
+        self.applied += 1
+        self.since_compaction += 1
+        if self.since_compaction >= self.checkpoint_interval:
+            self.compact()
+
+    def can_undo(self) -> bool:
+        """
+        Checks if there is an operation that can be undone.
+
+        :return: If an operation can be undone
+        """
+        return self.applied > 0
+
+    def can_redo(self) -> bool:
+        """
+        Checks if there is an undone operation that can be redone.
+
+        :return: If an operation can be redone
+        """
+        return self.applied < len(self.entries)
+
+    def undo(self) -> tuple[Delta, ...]:
+        """
+        Steps back over the last applied operation, can_undo() has to be checked first.
+
+        :return: the changes of the operation, which have to be reverted
+        """
+        self.applied -= 1
+        return self.entries[self.applied]
+
+    def redo(self) -> tuple[Delta, ...]:
+        """
+        Steps forward over the next undone operation, can_redo() has to be checked first.
+
+        :return: the changes of the operation, which have to be applied again
+        """
+        self.applied += 1
+        return self.entries[self.applied - 1]
+
+    def compact(self) -> None:
+        """
+        Folds the applied operations that are older than the history into the checkpoint.
+        """
+        self.since_compaction = 0
+        folded = max(0, self.applied - self.history)
+        for entry in self.entries[:folded]:
+            for name, width, _, new in entry:
+                if new is None:
+                    self.checkpoint.pop(name, None)
+                else:
+                    self.checkpoint[name] = new[0], new[1], width
+        del self.entries[:folded]
+        self.applied -= folded
+
+    def restore_entry(self) -> tuple[Delta, ...]:
+        """
+        Creates an operation that places every item of the checkpoint, to rebuild the inventory from nothing.
+
+        :return: the changes placing the items at their positions in the checkpoint
+        """
+        return tuple((name, width, None, (column, row)) for name, (column, row, width) in self.checkpoint.items())
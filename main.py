@@ -1,17 +1,26 @@
-from sort import ArrayWrapper
+from inventory import Inventory
+from sort import ArrayWrapper, RowGrid
 import tkinter as tk
 
+# The time in seconds a drop may spend on sorting the inventory, so the UI stays responsive (one frame at 60 fps)
+DROP_TIME_BUDGET = 0.016
+
 
 class DragAndDrop:
-    def __init__(self, grid: int, width: int, height: int, left_corner: tuple[int, int]):
+    def __init__(self, grid: int, width: int, height: int, left_corner: tuple[int, int],
+                 row_type: type[ArrayWrapper] = ArrayWrapper, time_budget: float | None = DROP_TIME_BUDGET):
         """
         The DragAndDrop class creates an interactive Inventory of Items. These items can be dynamically added and
-        can be rearranged by the user via Drag and Drop on the Screen.
+        can be rearranged by the user via Drag and Drop on the Screen. The placement itself is left to an Inventory,
+        this class only translates between pixels and grid positions and moves the widgets.
 
         :param grid: The grids unit in pixel
         :param width: a multiple of grid in pixel (the multiple is the amount of columns in the inventory)
         :param height: a multiple of grid in pixel (the multiple is the amount of rows in the inventory)
         :param left_corner: the left corner given as (x, y) coordinates in pixel
+        :param row_type: the ArrayWrapper implementation used to store the rows of the inventory
+        :param time_budget: the time in seconds a drop may spend on sorting the inventory, if it runs out the
+                            cheapest layout found so far is used (None for no limit)
         """
         self.occupied_positions: dict[str, list[int]] = {}
         self.widgets: dict[str, tk.Widget] = {}
@@ -19,10 +28,19 @@ class DragAndDrop:
         self.min_x, self.min_y = left_corner
         self.max_x = self.min_x + width
         self.max_y = self.min_y + height
-        self.columns = width // grid
-        self.rows = height // grid
-        self.grid_occupancy: list[ArrayWrapper] = [ArrayWrapper([None for _ in range(self.columns)])
-                                                   for _ in range(self.rows)]
+        self.inventory = Inventory(width // grid, height // grid, row_type, time_budget)
+        # The grid position the dragged widget currently hovers over and the pending computation of the drop there
+        self.hovered: tuple[int, int] | None = None
+        self.idle_job: str | None = None
+
+    @property
+    def grid_occupancy(self) -> RowGrid:
+        """
+        Gets the rows of the underlying inventory.
+
+        :return: the rows of the inventory
+        """
+        return self.inventory.grid_occupancy
 
     def add_occupation(self, item: tk.Widget, grid_x: int, grid_y: int, width: int, name: str) -> bool:
         """
@@ -36,39 +54,56 @@ class DragAndDrop:
         :return: If the item could be placed in the inventory
         """
         item.internal_name = name
-        x = self.min_x + (self.grid * grid_x)
-        y = self.min_y + (self.grid * grid_y)
-
-        changes: dict[str, int] = {}
-        if grid_y < 0:
-            grid_x = -1
-            success = False
-            for temp_y in range(len(self.grid_occupancy)):
-                success, changes = self.grid_occupancy[temp_y].insert_and_return_changes(name, width, grid_x)
-                if success:
-                    y = self.min_y + (self.grid * temp_y)
-                    break
-            if not success:
-                return False
-        else:
-            success, changes = self.grid_occupancy[grid_y].insert_and_return_changes(name, width, grid_x)
-            if not success:
-                return False
-
-        self.occupied_positions[name] = [x, y, self.grid * width]
+        changes = self.inventory.add_item(name, width, grid_x, grid_y)
+        if changes is None:
+            return False
+
+        self.occupied_positions[name] = [self.min_x, self.min_y, self.grid * width]
         self.widgets[name] = item
-        item.bind("<ButtonPress-1>", DND.on_drag_start)
-        item.bind("<B1-Motion>", DND.on_drag_motion)
-        item.bind("<ButtonRelease-1>", DND.on_drag_stop)
+        item.bind("<ButtonPress-1>", self.on_drag_start)
+        item.bind("<B1-Motion>", self.on_drag_motion)
+        item.bind("<ButtonRelease-1>", self.on_drag_stop)
+
+        self.place_widgets(changes)
+        return True
 
-        for changed_item_name, position in changes.items():
-            _, y, width = self.occupied_positions[changed_item_name]
-            x = (position * self.grid) + self.min_x
+    def add_occupations(self, items: list[tuple[tk.Widget, int, str, tuple[int, int] | None]]) -> list[str]:
+        """
+        The function allows the placement of many new tk.Widgets into the Inventory at once. The items are packed
+        together by the inventory and every widget is placed a single time afterwards.
+
+        :param items: The tk.Widget, the amount of columns taken by it, its unique name and its desired position in the
+                      inventory grid as (x, y) (or None for any free space) for every item
+        :return: the names of the items that could not be placed in the inventory
+        """
+        changes, failed = self.inventory.add_items([(name, width, position) for _, width, name, position in items])
+        not_placed = set(failed)
+        for item, width, name, _ in items:
+            if name in not_placed:
+                continue
+            item.internal_name = name
+            self.occupied_positions[name] = [self.min_x, self.min_y, self.grid * width]
+            self.widgets[name] = item
+            item.bind("<ButtonPress-1>", self.on_drag_start)
+            item.bind("<B1-Motion>", self.on_drag_motion)
+            item.bind("<ButtonRelease-1>", self.on_drag_stop)
+
+        self.place_widgets(changes)
+        return failed
+
+    def place_widgets(self, changes: dict[str, tuple[int, int]]) -> None:
+        """
+        Places the given widgets with their full size at their new positions.
+
+        :param changes: the items that have been placed or moved with their new column and row
+        """
+        for changed_item_name, (column, row) in changes.items():
+            _, _, width = self.occupied_positions[changed_item_name]
+            x = (column * self.grid) + self.min_x
+            y = (row * self.grid) + self.min_y
             self.widgets[changed_item_name].place(x=x, y=y, width=width, height=self.grid)
             self.occupied_positions[changed_item_name] = [x, y, width]
 
-        return True
-
     @staticmethod
     def on_drag_start(event) -> None:
         """
@@ -79,21 +114,45 @@ class DragAndDrop:
         event.widget.startY = event.y
         event.widget.tkraise()
 
-    @staticmethod
-    def on_drag_motion(event) -> None:
+    def on_drag_motion(self, event) -> None:
         """
-        Moves the widget to the new position while dragging.
+        Moves the widget to the new position while dragging. Once the widget hovers over a new grid position, the drop
+        there is computed ahead of time as soon as the UI is idle, so releasing it there is fast.
         """
         x = event.widget.winfo_x() + (event.x - event.widget.startX)
         y = event.widget.winfo_y() + (event.y - event.widget.startY)
         event.widget.place(x=x, y=y)
 
+        name = event.widget.internal_name
+        target = self.calc_grid_position(x, y, self.occupied_positions[name][2])
+        if target is not None and target != self.hovered:
+            self.hovered = target
+            if self.idle_job is not None:
+                event.widget.after_cancel(self.idle_job)
+            self.idle_job = event.widget.after_idle(self.speculate, name, *target)
+
+    def speculate(self, name: str, grid_x: int, grid_y: int) -> None:
+        """
+        Computes the drop of the dragged item at the given position without changing the inventory.
+
+        :param name: the name of the dragged item
+        :param grid_x: the column the item hovers over
+        :param grid_y: the row the item hovers over
+        """
+        self.idle_job = None
+        self.inventory.preview_move(name, grid_x, grid_y)
+
     def on_drag_stop(self, event) -> None:
         """
         Positions the item to the new grid. The placement tries to insert the object at the desired position, and uses
         the insertion algorithm for that, if that fails the object is returned to the original position.
         If the item is dragged out of bounds it is always returned to its original position.
         """
+        if self.idle_job is not None:
+            event.widget.after_cancel(self.idle_job)
+            self.idle_job = None
+        self.hovered = None
+
         name = event.widget.internal_name
         old_x, old_y, width = self.occupied_positions[name]
         x = self.calc_bound_x(event.widget.winfo_x(), width)
@@ -101,10 +160,11 @@ class DragAndDrop:
 
         if x == -1 or y == -1 or (not self.reorder_other_widgets_around(name, x, y, width)):
             event.widget.place(x=old_x, y=old_y)
+        self.inventory.end_drag()
 
     def reorder_other_widgets_around(self, name: str, x: int, y: int, width: int) -> bool:
         """
-        Tries to reorder the item in the inventory, by trying multiple things in order.
+        Tries to reorder the item in the inventory and moves all widgets whose items have changed position.
 
         :param name: the name of the item to move
         :param x: the desired x position in pixels
@@ -112,54 +172,43 @@ class DragAndDrop:
         :param width: the items width in pixels
         :return: If the item could be successfully placed
         """
-        width //= self.grid
         pos_x = ((x - self.min_x) // self.grid)
         pos_y = ((y - self.min_y) // self.grid)
 
-        result_occupation: list[ArrayWrapper] = [self.grid_occupancy[i].copy() for i in range(self.rows)]
-        [obj.remove_item(name) for obj in result_occupation]
-        # First tries to insert without removing any items from the targeted row
-        success, changes = result_occupation[pos_y].insert_and_return_changes(name, width, pos_x)
-        if success:
-            self.occupied_positions[name][1] = y
-            self.update_item_position(changes)
-            self.grid_occupancy = result_occupation
-            return True
-
-        # If that fails tries to see if removing underlying items would be possible
-        items, total_width = result_occupation[pos_y].remove_items_under_new_item(width, pos_x)
-        if total_width > result_occupation[pos_y ^ 1].free_spaces():
+        changes = self.inventory.move_item(name, pos_x, pos_y)
+        if changes is None:
             return False
-
-        # If so, removes them and puts them in the other row before inserting the item in the desired row
-        freed_items_y = ((pos_y ^ 1) * self.grid) + self.min_y
-        for changed_item_name in items.keys():
-            self.occupied_positions[changed_item_name][1] = freed_items_y
-        self.occupied_positions[name][1] = y
-
-        for removed_item_name, changed_item_width in items.items():
-            _, changes = result_occupation[pos_y ^ 1].insert_and_return_changes(removed_item_name,
-                                                                                changed_item_width, -1)
-            self.update_item_position(changes)
-
-        _, changes = result_occupation[pos_y].insert_and_return_changes(name, width, pos_x)
         self.update_item_position(changes)
-
-        self.grid_occupancy = result_occupation
         return True
 
-    def update_item_position(self, changes: dict[str, int]) -> None:
+    def update_item_position(self, changes: dict[str, tuple[int, int]]) -> None:
         """
         Updates the given items with their new positions.
 
-        :param changes: the items that have changed position
+        :param changes: the items that have changed position with their new column and row
         """
-        for changed_item_name, position in changes.items():
-            _, pos_y, width = self.occupied_positions[changed_item_name]
-            pos_x = (position * self.grid) + self.min_x
+        for changed_item_name, (column, row) in changes.items():
+            width = self.occupied_positions[changed_item_name][2]
+            pos_x = (column * self.grid) + self.min_x
+            pos_y = (row * self.grid) + self.min_y
             self.widgets[changed_item_name].place(x=pos_x, y=pos_y)
             self.occupied_positions[changed_item_name] = [pos_x, pos_y, width]
 
+    def calc_grid_position(self, x: int, y: int, width: int) -> tuple[int, int] | None:
+        """
+        Calculates the grid position an item at the given imprecise position would be dropped at.
+
+        :param x: the imprecise x position of the item in pixel
+        :param y: the imprecise y position of the item in pixel
+        :param width: the width of the item in pixel
+        :return: the column and the row, or None if the item is out of bounds
+        """
+        x = self.calc_bound_x(x, width)
+        y = self.calc_bound_y(y)
+        if x == -1 or y == -1:
+            return None
+        return (x - self.min_x) // self.grid, (y - self.min_y) // self.grid
+
     def calc_bound_x(self, pos: int, width: int) -> int:
         """
         Takes in the imprecise target x position of the Drag and Drop operation and tries to find the correct precise
@@ -170,9 +219,7 @@ class DragAndDrop:
         :return: Returns the precise x position, or if the item was out of bounds -1
         """
         temp_val = ((pos + int(self.grid / 2)) // self.grid) * self.grid
-        if temp_val < self.min_x:
-            return -1
-        if temp_val + width > self.max_x:
+        if not self.inventory.in_bounds((temp_val - self.min_x) // self.grid, 0, width // self.grid):
             return -1
         return temp_val
 
@@ -185,9 +232,7 @@ class DragAndDrop:
         :return: Returns the precise y position, or if the item was out of bounds -1
         """
         temp_val = ((pos + int(self.grid / 2)) // self.grid) * self.grid
-        if temp_val < self.min_y:
-            return -1
-        if temp_val + self.grid > self.max_y:
+        if not self.inventory.in_bounds(0, (temp_val - self.min_y) // self.grid, 0):
             return -1
         return temp_val
 
@@ -196,14 +241,14 @@ WIDTH = 1000
 HEIGHT = 200
 LEFT = 100
 TOP = 100
-DND = DragAndDrop(100, WIDTH, HEIGHT, (LEFT, TOP))
 
 
-def create_label(root: tk.Tk, width: int, counter: int) -> int:
+def create_label(root: tk.Tk, dnd: DragAndDrop, width: int, counter: int) -> int:
     """
     A small abstracted function to make inserting a few items into the inventory easy and quick.
 
     :param root: tk.Tk object to which the label should be tied
+    :param dnd: the DragAndDrop inventory to insert the label into
     :param width: the width of the object in grid units (not pixel)
     :param counter: a unique number to properly identify the label
     :return: returns the counter incremented by 1
@@ -212,7 +257,7 @@ def create_label(root: tk.Tk, width: int, counter: int) -> int:
               "chartreuse", "crimson", "chocolate1", "darksalmon", "deepskyblue"]
     color = colors[counter % len(colors)]
     label = tk.Label(root, text=f"Drag Me!\nItem {counter}", bg=color, font=("Arial", 10))
-    DND.add_occupation(label, -1, -1, width, f"ITEM-{counter}-{width}")
+    dnd.add_occupation(label, -1, -1, width, f"ITEM-{counter}-{width}")
     return counter + 1
 
 
@@ -225,17 +270,18 @@ def main():
     # Create draggable label
     label_bg = tk.Label(root, text="", bg="white", font=("Arial", 10))
     label_bg.place(x=LEFT, y=TOP, width=WIDTH, height=HEIGHT)
+    dnd = DragAndDrop(100, WIDTH, HEIGHT, (LEFT, TOP))
 
     counter = 1
-    counter = create_label(root, 2, counter)
-    counter = create_label(root, 3, counter)
-    counter = create_label(root, 3, counter)
-    counter = create_label(root, 4, counter)
-    counter = create_label(root, 2, counter)
-    counter = create_label(root, 1, counter)
-    counter = create_label(root, 1, counter)
-    counter = create_label(root, 2, counter)
-    create_label(root, 1, counter)
+    counter = create_label(root, dnd, 2, counter)
+    counter = create_label(root, dnd, 3, counter)
+    counter = create_label(root, dnd, 3, counter)
+    counter = create_label(root, dnd, 4, counter)
+    counter = create_label(root, dnd, 2, counter)
+    counter = create_label(root, dnd, 1, counter)
+    counter = create_label(root, dnd, 1, counter)
+    counter = create_label(root, dnd, 2, counter)
+    create_label(root, dnd, 1, counter)
 
     root.mainloop()
 
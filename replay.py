@@ -0,0 +1,222 @@
+from inventory import Inventory, ROW_TYPES
+from snapshot import read_snapshot, write_snapshot
+from sort import ResultCache, ENGINE_DFS, ENGINE_BEST_FIRST, ENGINE_ITERATIVE
+from time import perf_counter
+from typing import Iterable, Iterator
+import argparse
+import json
+
+OPERATIONS = ("add", "move", "remove")
+
+# An operation of a log: its kind, the name of the item, its width and the desired column and row (-1 if not given)
+Operation = tuple[str, str, int, int, int]
+
+
+class Timings:
+    def __init__(self):
+        """
+        The Timings class adds up the durations of the replayed operations by their kind, without keeping the single
+        durations, so the memory needed does not grow with the length of the log.
+        """
+        # The amount of operations, the failed ones among them, their total and their longest duration by kind
+        self.totals: dict[str, list] = {kind: [0, 0, 0.0, 0.0] for kind in OPERATIONS}
+
+    def add(self, kind: str, success: bool, seconds: float) -> None:
+        """
+        Notes a replayed operation.
+
+        :param kind: the kind of the operation
+        :param success: if the operation could be carried out
+        :param seconds: the duration of the operation
+        """
+        totals = self.totals[kind]
+        totals[0] += 1
+        totals[1] += not success
+        totals[2] += seconds
+        totals[3] = max(totals[3], seconds)
+
+    def lines(self) -> Iterator[str]:
+        """
+        Formats the added up durations as a table.
+
+        :return: a header, a line for every kind of operation and a line with the sum of all operations
+        """
+        yield f"{'op':<8}{'count':>10}{'failed':>8}{'total ms':>12}{'mean ms':>10}{'max ms':>10}{'ops/s':>12}"
+        count = sum(totals[0] for totals in self.totals.values())
+        failed = sum(totals[1] for totals in self.totals.values())
+        seconds = sum(totals[2] for totals in self.totals.values())
+        longest = max(totals[3] for totals in self.totals.values())
+        for kind, (kind_count, kind_failed, kind_seconds, kind_longest) in [*self.totals.items(),
+                                                                            ("all", (count, failed, seconds, longest))]:
+            mean = kind_seconds / kind_count if kind_count else 0.0
+            rate = kind_count / kind_seconds if kind_seconds > 0 else float("inf")
+            yield (f"{kind:<8}{kind_count:>10}{kind_failed:>8}{kind_seconds * 1000:>12.1f}{mean * 1000:>10.3f}"
+                   f"{kind_longest * 1000:>10.3f}{rate:>12.1f}")
+
+
+def read_lines(path: str) -> Iterator[tuple[int, str]]:
+    """
+    Reads a log line by line, only the current line is held in memory.
+
+    :param path: the path of the log
+    :return: the number and the content of every line that is not blank
+    """
+    with open(path, encoding="utf-8") as file:
+        for number, line in enumerate(file, start=1):
+            if line.strip():
+                yield number, line
+
+
+def parse_operations(lines: Iterable[tuple[int, str]]) -> Iterator[Operation]:
+    """
+    Parses the lines of a log, every line is a JSON object of one of the forms
+    {"op": "add", "name": ..., "width": ..., "row": ..., "col": ...} (row and col are optional),
+    {"op": "move", "name": ..., "row": ..., "col": ...} and {"op": "remove", "name": ...}.
+
+    :param lines: the number and the content of every line
+    :return: the operation of every line
+    """
+    for number, line in lines:
+        try:
+            entry = json.loads(line)
+            kind = entry["op"]
+            if kind not in OPERATIONS:
+                raise ValueError(f"unknown operation {kind!r}")
+            if kind == "move":
+                yield kind, str(entry["name"]), 0, int(entry["col"]), int(entry["row"])
+            else:
+                yield kind, str(entry["name"]), int(entry.get("width", 0)), int(entry.get("col", -1)), \
+                    int(entry.get("row", -1))
+        except (KeyError, TypeError, ValueError) as error:
+            raise ValueError(f"line {number}: {error!r}") from error
+
+
+def apply_operations(inventory: Inventory, operations: Iterable[Operation]) -> Iterator[tuple[str, bool, float]]:
+    """
+    Carries out the operations on the inventory one after another and measures every single one. Operations on
+    unknown items, adding an item twice and positions out of bounds fail without changing the inventory.
+
+    :param inventory: the inventory to change
+    :param operations: the operations to carry out
+    :return: the kind, the success and the duration in seconds of every operation
+    """
+    for kind, name, width, grid_x, grid_y in operations:
+        start = perf_counter()
+        if kind == "add":
+            success = (name not in inventory.positions and width > 0 and grid_y < inventory.rows
+                       and (grid_x < 0 or grid_y < 0 or inventory.in_bounds(grid_x, grid_y, width))
+                       and inventory.add_item(name, width, grid_x, grid_y) is not None)
+        elif kind == "move":
+            success = (name in inventory.positions
+                       and inventory.in_bounds(grid_x, grid_y, inventory.positions[name][2])
+                       and inventory.move_item(name, grid_x, grid_y) is not None)
+        else:
+            success = inventory.remove_item(name)
+        yield kind, success, perf_counter() - start
+
+
+def checkpoint(results: Iterable[tuple[str, bool, float]], inventory: Inventory, path: str | None, every: int) \
+        -> Iterator[tuple[str, bool, float]]:
+    """
+    Passes the results of the operations on and writes a snapshot of the inventory after every given amount of
+    operations, so a long replay can be continued from there.
+
+    :param results: the results of the operations
+    :param inventory: the inventory the operations are carried out on
+    :param path: the path of the snapshot (None to write no snapshots)
+    :param every: the amount of operations between two snapshots
+    :return: the same results
+    """
+    for count, result in enumerate(results, start=1):
+        if path is not None and count % every == 0:
+            write_snapshot(inventory, path)
+        yield result
+
+
+def replay(path: str, inventory: Inventory, checkpoint_path: str | None = None, every: int = 10000) -> Timings:
+    """
+    Streams a log through the inventory.
+
+    :param path: the path of the log
+    :param inventory: the inventory to carry the operations out on
+    :param checkpoint_path: the path snapshots of the inventory are written to (None to write no snapshots)
+    :param every: the amount of operations between two snapshots
+    :return: the added up durations of the operations
+    """
+    timings = Timings()
+    for kind, success, seconds in checkpoint(apply_operations(inventory, parse_operations(read_lines(path))),
+                                             inventory, checkpoint_path, every):
+        timings.add(kind, success, seconds)
+    if checkpoint_path is not None:
+        write_snapshot(inventory, checkpoint_path)
+    return timings
+
+
+def layout_lines(inventory: Inventory) -> Iterator[str]:
+    """
+    Formats the rows of the inventory.
+
+    :param inventory: the inventory to format
+    :return: a line for every row listing its items as name@column+width from left to right
+    """
+    for row, arr in enumerate(inventory.grid_occupancy):
+        items: list[str] = []
+        column = 0
+        for name, width in arr.to_runs():
+            if name is not None:
+                items.append(f"{name}@{column}+{width}")
+            column += width
+        yield f"{row:>4}: {' '.join(items)}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replays a JSONL log of inventory operations without a window.")
+    parser.add_argument("log", help="the log, one JSON object per line with op add, move or remove")
+    parser.add_argument("--columns", type=int, default=20)
+    parser.add_argument("--rows", type=int, default=8)
+    parser.add_argument("--row-type", choices=sorted(ROW_TYPES), default="list")
+    parser.add_argument("--engines", default=ENGINE_DFS,
+                        help=f"comma separated engines to compare ({ENGINE_DFS}, {ENGINE_BEST_FIRST}, "
+                             f"{ENGINE_ITERATIVE}), the log is streamed once per engine")
+    parser.add_argument("--time-budget", type=float, default=None, help="seconds a single operation may sort")
+    parser.add_argument("--cache-size", type=int, default=0,
+                        help="results kept by the solver cache (0 disables the cache)")
+    parser.add_argument("--start", help="a snapshot to start from instead of an empty inventory")
+    parser.add_argument("--checkpoint", help="path of the snapshots written during the replay, {engine} is replaced "
+                                             "by the engine")
+    parser.add_argument("--checkpoint-every", type=int, default=10000, help="operations between two snapshots")
+    parser.add_argument("--no-layout", action="store_true", help="skip printing the final layout")
+    args = parser.parse_args()
+
+    engines = args.engines.split(",")
+    for engine in engines:
+        if engine not in (ENGINE_DFS, ENGINE_BEST_FIRST, ENGINE_ITERATIVE):
+            parser.error(f"unknown engine {engine!r}")
+
+    first: tuple[str, dict[str, list[int]]] | None = None
+    for engine in engines:
+        cache = ResultCache(args.cache_size) if args.cache_size > 0 else None
+        row_type = ROW_TYPES[args.row_type]
+        if args.start is not None:
+            inventory = read_snapshot(args.start, row_type, args.time_budget, cache=cache)
+        else:
+            inventory = Inventory(args.columns, args.rows, row_type, args.time_budget, cache=cache)
+        inventory.engine = engine
+        checkpoint_path = args.checkpoint.replace("{engine}", engine) if args.checkpoint is not None else None
+        timings = replay(args.log, inventory, checkpoint_path, args.checkpoint_every)
+
+        print(f"engine {engine}")
+        for line in timings.lines():
+            print("    " + line)
+        if first is None:
+            first = engine, inventory.positions
+            if not args.no_layout:
+                for line in layout_lines(inventory):
+                    print(line)
+        else:
+            same = "the same as" if inventory.positions == first[1] else "different from"
+            print(f"    final layout is {same} {first[0]}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,379 @@
+from inventory import Inventory, ROW_TYPES
+from sort import ArrayWrapper
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from time import perf_counter
+import argparse
+import asyncio
+import json
+import logging
+import random
+
+# The operations that may sort rows, they run on the worker threads, all other operations are answered directly
+SOLVING_OPERATIONS = ("add", "move")
+# The largest inventory a request may ask for, so a single request can not allocate an arbitrarily large grid
+SERVICE_MAX_COLUMNS = 1024
+SERVICE_MAX_ROWS = 256
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceMetrics:
+    __slots__ = ('started', 'completed', 'failed', 'by_operation', 'in_flight', 'max_in_flight', 'waiting',
+                 'solving', 'busy_time')
+
+    def __init__(self):
+        """
+        The ServiceMetrics class counts the requests of an InventoryService, so its throughput and how many requests
+        pile up can be watched while it runs.
+        """
+        self.started = perf_counter()
+        self.completed = 0
+        self.failed = 0
+        self.by_operation: dict[str, int] = {}
+        # The requests that were received but not answered yet, the most there ever were at once, the requests
+        # waiting for the lock of their inventory and the requests handed to the worker threads
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.waiting = 0
+        self.solving = 0
+        # The seconds spent carrying out requests after their lock was acquired, including the wait for a worker thread
+        self.busy_time = 0.0
+
+    def as_dict(self) -> dict[str, int | float | dict[str, int]]:
+        """
+        Gets all counters together with the throughput since the start.
+
+        :return: the counters by their name
+        """
+        elapsed = perf_counter() - self.started
+        result: dict[str, int | float | dict[str, int]] = {name: getattr(self, name) for name in self.__slots__
+                                                           if name != 'started'}
+        result["by_operation"] = dict(self.by_operation)
+        result["uptime"] = elapsed
+        result["throughput"] = self.completed / elapsed if elapsed > 0 else 0.0
+        return result
+
+
+class InventoryService:
+    def __init__(self, columns: int, rows: int, row_type: type[ArrayWrapper] = ArrayWrapper,
+                 time_budget: float | None = None, workers: Executor | None = None, pool: Executor | None = None,
+                 max_columns: int = SERVICE_MAX_COLUMNS, max_rows: int = SERVICE_MAX_ROWS):
+        """
+        The InventoryService hosts many independent inventories, one per session, and carries out operations on them.
+        Operations on the same inventory are carried out one after another, operations on different inventories run
+        at the same time. Operations that sort rows run on the worker threads, so the event loop stays responsive.
+
+        :param columns: the amount of columns of a new inventory
+        :param rows: the amount of rows of a new inventory
+        :param row_type: the ArrayWrapper implementation used to store the rows of the inventories
+        :param time_budget: the time in seconds a single add or move may spend on sorting (None for no limit)
+        :param workers: the threads the sorting operations run on (None for the default executor of the event loop)
+        :param pool: a process pool that sorts wide rows in parallel (None to sort everything in this process)
+        :param max_columns: the largest amount of columns a request may ask for
+        :param max_rows: the largest amount of rows a request may ask for
+        """
+        self.columns = columns
+        self.rows = rows
+        self.row_type = row_type
+        self.time_budget = time_budget
+        self.workers = workers
+        self.pool = pool
+        self.max_columns = max_columns
+        self.max_rows = max_rows
+        self.inventories: dict[str, Inventory] = {}
+        self.locks: dict[str, asyncio.Lock] = {}
+        self.metrics = ServiceMetrics()
+
+    def inventory(self, session: str, columns: int | None = None, rows: int | None = None) -> Inventory:
+        """
+        Gets the inventory of a session, a new one is created the first time a session is used.
+
+        :param session: the id of the session
+        :param columns: the amount of columns if the inventory is created (None for the default)
+        :param rows: the amount of rows if the inventory is created (None for the default)
+        :return: the inventory of the session
+        """
+        for label, value, limit in (("columns", columns, self.max_columns), ("rows", rows, self.max_rows)):
+            if value is not None and (type(value) is not int or not 0 < value <= limit):
+                raise ValueError(f"{label} has to be a whole number from 1 to {limit}, got {value!r}")
+        if session not in self.inventories:
+            self.inventories[session] = Inventory(columns or self.columns, rows or self.rows, self.row_type,
+                                                  self.time_budget, pool=self.pool)
+            self.locks[session] = asyncio.Lock()
+        return self.inventories[session]
+
+    async def handle(self, request: dict) -> dict:
+        """
+        Carries out a single request and notes it in the metrics.
+
+        :param request: the decoded request, see carry_out() for the operations
+        :return: the response, it contains the id of the request if it had one
+        """
+        metrics = self.metrics
+        metrics.in_flight += 1
+        metrics.max_in_flight = max(metrics.max_in_flight, metrics.in_flight)
+        try:
+            response = await self.dispatch(request)
+        except (KeyError, TypeError, ValueError) as error:
+            response = {"ok": False, "error": repr(error)}
+        except Exception as error:
+            # Every request is answered, otherwise the client would wait for its response forever
+            logger.exception("request %r failed", request)
+            response = {"ok": False, "error": repr(error)}
+        finally:
+            metrics.in_flight -= 1
+        operation = str(request.get("op"))
+        metrics.by_operation[operation] = metrics.by_operation.get(operation, 0) + 1
+        metrics.completed += 1
+        metrics.failed += not response["ok"]
+        if "id" in request:
+            response["id"] = request["id"]
+        return response
+
+    async def dispatch(self, request: dict) -> dict:
+        """
+        Waits for the lock of the inventory of the request and carries it out, on a worker thread if it may sort rows.
+        A close waits for the requests on the inventory before it as well, the requests that were still waiting for the
+        closed inventory are rejected.
+
+        :param request: the decoded request
+        :return: the response
+        """
+        operation = request["op"]
+        if operation == "metrics":
+            return {"ok": True, "result": self.metrics.as_dict()}
+        session = str(request["inventory"])
+        if operation == "close" and session not in self.inventories:
+            return {"ok": False}
+
+        inventory = self.inventory(session, request.get("columns"), request.get("rows"))
+        lock = self.locks[session]
+        self.metrics.waiting += 1
+        try:
+            await lock.acquire()
+        finally:
+            # A request cancelled while it waits does not wait anymore either
+            self.metrics.waiting -= 1
+        try:
+            if self.inventories.get(session) is not inventory:
+                return {"ok": False, "error": "the inventory was closed"}
+            if operation == "close":
+                del self.inventories[session]
+                del self.locks[session]
+                return {"ok": True}
+            start = perf_counter()
+            if operation in SOLVING_OPERATIONS:
+                self.metrics.solving += 1
+                try:
+                    response = await asyncio.get_running_loop().run_in_executor(self.workers, carry_out, inventory,
+                                                                                request)
+                finally:
+                    self.metrics.solving -= 1
+            else:
+                response = carry_out(inventory, request)
+            self.metrics.busy_time += perf_counter() - start
+        finally:
+            lock.release()
+        return response
+
+    async def serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Answers the requests of a connection, every line is a JSON request and gets a JSON line as response. A client
+        may send further requests before the previous ones are answered, the responses are then matched by their id.
+
+        :param reader: the incoming side of the connection
+        :param writer: the outgoing side of the connection
+        """
+        tasks: set[asyncio.Task] = set()
+
+        async def answer(line: bytes) -> None:
+            try:
+                request = json.loads(line)
+            except ValueError as error:
+                response = {"ok": False, "error": repr(error)}
+            else:
+                response = await self.handle(request) if isinstance(request, dict) else \
+                    {"ok": False, "error": "the request has to be a JSON object"}
+            writer.write(json.dumps(response).encode() + b"\n")
+            await writer.drain()
+
+        try:
+            while line := await reader.readline():
+                if line.strip():
+                    task = asyncio.create_task(answer(line))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+def carry_out(inventory: Inventory, request: dict) -> dict:
+    """
+    Carries out an operation on an inventory. The operations are "add" (name, width and optionally col and row),
+    "move" (name, col and row), "remove" (name) and "layout", which gets every item with its column, row and width.
+
+    :param inventory: the inventory of the request
+    :param request: the decoded request
+    :return: the response with the changed items and their new column and row as result
+    """
+    operation = request["op"]
+    if operation == "add":
+        name, width = str(request["name"]), int(request["width"])
+        grid_x, grid_y = int(request.get("col", -1)), int(request.get("row", -1))
+        if name in inventory.positions or width <= 0 or grid_y >= inventory.rows \
+                or (grid_x >= 0 and grid_y >= 0 and not inventory.in_bounds(grid_x, grid_y, width)):
+            return {"ok": False}
+        changes = inventory.add_item(name, width, grid_x, grid_y)
+    elif operation == "move":
+        name, grid_x, grid_y = str(request["name"]), int(request["col"]), int(request["row"])
+        if name not in inventory.positions or not inventory.in_bounds(grid_x, grid_y, inventory.positions[name][2]):
+            return {"ok": False}
+        changes = inventory.move_item(name, grid_x, grid_y)
+    elif operation == "remove":
+        return {"ok": inventory.remove_item(str(request["name"]))}
+    elif operation == "layout":
+        return {"ok": True, "result": inventory.positions}
+    else:
+        raise ValueError(f"unknown operation {operation!r}")
+    return {"ok": changes is not None, "result": changes}
+
+
+async def serve(service: InventoryService, host: str, port: int, report_every: float | None = None) -> None:
+    """
+    Runs the service on a local socket until it is cancelled.
+
+    :param service: the service to run
+    :param host: the host name or address to listen on
+    :param port: the port to listen on
+    :param report_every: the seconds between two prints of the metrics (None to never print them)
+    """
+    server = await asyncio.start_server(service.serve_connection, host, port)
+    print(f"serving on {', '.join(str(socket.getsockname()) for socket in server.sockets)}", flush=True)
+    async with server:
+        if report_every is None:
+            await server.serve_forever()
+        else:
+            serving = asyncio.create_task(server.serve_forever())
+            while not serving.done():
+                await asyncio.sleep(report_every)
+                print(json.dumps(service.metrics.as_dict()), flush=True)
+
+
+async def generate_load(host: str, port: int, connections: int, requests: int, inventories: int, columns: int,
+                        rows: int, width: int, seed: int) -> dict:
+    """
+    Sends random add, move and remove requests for many inventories over many connections at once. Every connection
+    waits for the response before sending its next request.
+
+    :param host: the host name or address of the service
+    :param port: the port of the service
+    :param connections: the amount of connections sending requests at the same time
+    :param requests: the amount of requests sent over every connection
+    :param inventories: the amount of inventories the requests are spread over
+    :param columns: the amount of columns of the inventories of the service
+    :param rows: the amount of rows of the inventories of the service
+    :param width: the largest width of an added item
+    :param seed: the seed of the random numbers
+    :return: the measured latencies and throughput together with the metrics of the service
+    """
+    # The items with their width every inventory should contain as far as the client knows
+    items: dict[str, dict[str, int]] = {f"session-{index}": {} for index in range(inventories)}
+    sessions = list(items)
+    latencies: list[float] = []
+
+    async def connection(number: int) -> None:
+        rng = random.Random(seed * 1000003 + number)
+        reader, writer = await asyncio.open_connection(host, port)
+        for index in range(requests):
+            session = rng.choice(sessions)
+            names = items[session]
+            choice = rng.random()
+            added = None
+            if choice < 0.3 or not names:
+                added = f"ITEM-{number}-{index}"
+                request = {"op": "add", "inventory": session, "name": added, "width": rng.randint(1, width)}
+            elif choice < 0.9:
+                name = rng.choice(list(names))
+                # The item has to fit into the row at the column it is moved to
+                request = {"op": "move", "inventory": session, "name": name,
+                           "col": rng.randrange(columns - names[name] + 1), "row": rng.randrange(rows)}
+            else:
+                name = rng.choice(list(names))
+                del names[name]
+                request = {"op": "remove", "inventory": session, "name": name}
+            request["id"] = index
+            start = perf_counter()
+            writer.write(json.dumps(request).encode() + b"\n")
+            await writer.drain()
+            response = json.loads(await reader.readline())
+            latencies.append(perf_counter() - start)
+            # Only an item that was actually placed is moved or removed later on
+            if added is not None and response["ok"]:
+                names[added] = request["width"]
+        writer.close()
+
+    start = perf_counter()
+    await asyncio.gather(*(connection(number) for number in range(connections)))
+    elapsed = perf_counter() - start
+
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(b'{"op": "metrics"}\n')
+    await writer.drain()
+    metrics = json.loads(await reader.readline())["result"]
+    writer.close()
+
+    latencies.sort()
+    return {"requests": len(latencies), "seconds": elapsed, "throughput": len(latencies) / elapsed,
+            "p50 ms": latencies[len(latencies) // 2] * 1000,
+            "p99 ms": latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))] * 1000, "service": metrics}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hosts many inventories behind a local socket, or generates load "
+                                                 "for such a service.")
+    parser.add_argument("mode", choices=["serve", "load"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--columns", type=int, default=20, help="columns of an inventory")
+    parser.add_argument("--rows", type=int, default=8, help="rows of an inventory")
+    parser.add_argument("--max-columns", type=int, default=SERVICE_MAX_COLUMNS,
+                        help="most columns a request may ask for (serve)")
+    parser.add_argument("--max-rows", type=int, default=SERVICE_MAX_ROWS,
+                        help="most rows a request may ask for (serve)")
+    parser.add_argument("--row-type", choices=sorted(ROW_TYPES), default="list", help="row backend (serve)")
+    parser.add_argument("--time-budget", type=float, default=None, help="seconds an operation may sort (serve)")
+    parser.add_argument("--threads", type=int, default=4, help="worker threads carrying out sorts (serve)")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="size of the process pool for wide rows, 0 disables the pool (serve)")
+    parser.add_argument("--report-every", type=float, default=None, help="seconds between metric prints (serve)")
+    parser.add_argument("--connections", type=int, default=50, help="concurrent connections (load)")
+    parser.add_argument("--requests", type=int, default=200, help="requests per connection (load)")
+    parser.add_argument("--inventories", type=int, default=1000, help="inventories the requests go to (load)")
+    parser.add_argument("--max-width", type=int, default=4, help="largest width of an added item (load)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random requests (load)")
+    args = parser.parse_args()
+
+    if args.mode == "load":
+        result = asyncio.run(generate_load(args.host, args.port, args.connections, args.requests, args.inventories,
+                                           args.columns, args.rows, args.max_width, args.seed))
+        print(json.dumps(result, indent=2))
+        return
+
+    pool = ProcessPoolExecutor(args.workers) if args.workers > 0 else None
+    with ThreadPoolExecutor(args.threads) as workers:
+        service = InventoryService(args.columns, args.rows, ROW_TYPES[args.row_type], args.time_budget, workers, pool,
+                                   args.max_columns, args.max_rows)
+        try:
+            asyncio.run(serve(service, args.host, args.port, args.report_every))
+        except KeyboardInterrupt:
+            pass
+    if pool is not None:
+        pool.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+from inventory import Inventory
+from sort import ArrayWrapper, CodedArrayWrapper, MaxSegmentTree, NameTable, ResultCache, RowGrid, SolverStats, \
+    ID_LIMIT_SHORT
+from array import array
+from concurrent.futures import Executor
+from itertools import accumulate
+import mmap
+import struct
+import sys
+
+# Identifies a snapshot file and the layout of its content, files of other versions are rejected
+SNAPSHOT_MAGIC = b"INVS"
+SNAPSHOT_VERSION = 1
+# The magic, the version, the size of an item id in bytes, the amount of columns, the amount of rows and the amount of
+# names, all little endian
+SNAPSHOT_HEADER = struct.Struct("<4sHHIII")
+# The array type codes of the item ids by their size in bytes
+ID_TYPES = {2: "H", 4: "I"}
+# The row of an item in the item table that is not placed in the inventory
+NOT_PLACED = 0xFFFFFFFF
+
+
+def write_snapshot(inventory: Inventory, path: str) -> None:
+    """
+    Writes the state of the inventory into a binary snapshot file. The file starts with the SNAPSHOT_HEADER, which is
+    followed by the byte length of every name, the starting column, the row and the width of every name, the UTF-8
+    encoded names, padding up to a multiple of 8 bytes and finally the item ids of every row, where 0 is a free space
+    and every other id is the position of a name in the name table plus 1. All numbers are little endian.
+    CodedArrayWrapper rows sharing a NameTable are written out as they are, without translating a single space.
+
+    :param inventory: the inventory to save, it is not modified
+    :param path: the path of the file to write
+    """
+    rows = list(inventory.grid_occupancy)
+    table = rows[0].names if isinstance(rows[0], CodedArrayWrapper) else None
+    if table is not None and all(isinstance(row, CodedArrayWrapper) and row.names is table for row in rows):
+        names = table.names[1:]
+        id_size = 2 if len(table) <= ID_LIMIT_SHORT else 4
+        # Rows that never needed one of the larger ids are still stored with the smaller ones
+        row_bytes = [_little_endian_bytes(row.arr if row.arr.typecode == ID_TYPES[id_size]
+                                          else array(ID_TYPES[id_size], row.arr)) for row in rows]
+    else:
+        table = NameTable()
+        ids = [[table.id_of(name) for name in row.to_list()] for row in rows]
+        names = table.names[1:]
+        id_size = 2 if len(table) <= ID_LIMIT_SHORT else 4
+        row_bytes = [_little_endian_bytes(array(ID_TYPES[id_size], row_ids)) for row_ids in ids]
+
+    encoded = [name.encode() for name in names]
+    positions = inventory.positions
+    not_placed = (0, NOT_PLACED, 0)
+    items = array("I", [value for name in names for value in positions.get(name, not_placed)])
+    header = SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, id_size, inventory.columns, inventory.rows,
+                                  len(names))
+    lengths = array("I", map(len, encoded))
+    blob = b"".join(encoded)
+    size = len(header) + 4 * len(lengths) + 4 * len(items) + len(blob)
+
+    with open(path, "wb") as file:
+        file.write(header)
+        file.write(_little_endian_bytes(lengths))
+        file.write(_little_endian_bytes(items))
+        file.write(blob)
+        file.write(bytes(-size % 8))
+        for data in row_bytes:
+            file.write(data)
+
+
+def read_snapshot(path: str, row_type: type[ArrayWrapper] = ArrayWrapper, time_budget: float | None = None,
+                  stats: SolverStats | None = None, pool: Executor | None = None,
+                  cache: ResultCache | None = None) -> Inventory:
+    """
+    Restores an inventory from a snapshot file written by write_snapshot(), without sorting a single item. The file is
+    memory mapped, CodedArrayWrapper rows copy their ids straight out of the mapping and all other rows are translated
+    from the ids.
+
+    :param path: the path of the file to read
+    :param row_type: the ArrayWrapper implementation used to store the rows of the inventory
+    :param time_budget: the time in seconds a single add or move may spend on sorting the inventory (None for no
+                        limit)
+    :param stats: collects statistics about every sort of the inventory if given
+    :param pool: a process pool that sorts wide rows in parallel (None to sort everything in this process)
+    :param cache: remembers the results of earlier sorts (None to always sort)
+    :return: the restored inventory
+    """
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        view = memoryview(mapped)
+        try:
+            return _read_mapped(view, row_type, time_budget, stats, pool, cache)
+        finally:
+            view.release()
+
+
+def _read_mapped(view: memoryview, row_type: type[ArrayWrapper], time_budget: float | None,
+                 stats: SolverStats | None, pool: Executor | None, cache: ResultCache | None) -> Inventory:
+    """
+    Restores an inventory from the content of a snapshot file.
+
+    :param view: the content of the file, no reference to it is kept
+    :param row_type: the ArrayWrapper implementation used to store the rows of the inventory
+    :param time_budget: the time in seconds a single add or move may spend on sorting the inventory
+    :param stats: collects statistics about every sort of the inventory if given
+    :param pool: a process pool that sorts wide rows in parallel
+    :param cache: remembers the results of earlier sorts
+    :return: the restored inventory
+    """
+    if len(view) < SNAPSHOT_HEADER.size:
+        raise ValueError("the file is too short to be a snapshot")
+    magic, version, id_size, columns, rows, count = SNAPSHOT_HEADER.unpack_from(view)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError("the file is not a snapshot")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"unsupported snapshot version {version}, expected {SNAPSHOT_VERSION}")
+    if id_size not in ID_TYPES:
+        raise ValueError(f"unsupported item id size {id_size}")
+
+    offset = SNAPSHOT_HEADER.size
+    lengths = _read_array("I", view, offset, count)
+    offset += 4 * count
+    items = _read_array("I", view, offset, 3 * count)
+    offset += 12 * count
+    blob = view[offset:offset + sum(lengths)].tobytes()
+    offset += len(blob)
+    offset += -offset % 8
+    if len(blob) != sum(lengths) or len(view) != offset + id_size * columns * rows:
+        raise ValueError("the snapshot is truncated")
+
+    ends = list(accumulate(lengths))
+    names = [blob[start:end].decode() for start, end in zip([0] + ends, ends)]
+    table = NameTable(names)
+
+    inventory = Inventory(columns, rows, row_type, time_budget, stats, pool, cache)
+    row_size = id_size * columns
+    loaded: list[ArrayWrapper] = []
+    for row in range(rows):
+        ids = _read_array(ID_TYPES[id_size], view, offset + row * row_size, columns)
+        if row_type is CodedArrayWrapper:
+            loaded.append(CodedArrayWrapper(ids, table))
+        else:
+            loaded.append(row_type([table.names[name_id] for name_id in ids]))
+    inventory.grid_occupancy = RowGrid(loaded)
+
+    values = iter(items)
+    inventory.positions = {name: [column, row, width] for name, (column, row, width) in
+                           zip(names, zip(values, values, values)) if row != NOT_PLACED}
+    inventory.free_spaces = MaxSegmentTree([arr.free_spaces() for arr in loaded])
+    # The longest stretches are only calculated once they are needed
+    inventory.changed_rows = set(range(rows))
+    return inventory
+
+
+def _read_array(typecode: str, view: memoryview, offset: int, length: int) -> array:
+    """
+    Copies little endian numbers out of the content of a snapshot file.
+
+    :param typecode: the array type code of the numbers
+    :param view: the content of the file
+    :param offset: the position of the first number in bytes
+    :param length: the amount of numbers
+    :return: the numbers
+    """
+    values = array(typecode)
+    values.frombytes(view[offset:offset + values.itemsize * length])
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def _little_endian_bytes(values: array) -> bytes:
+    """
+    Gets the numbers as little endian bytes.
+
+    :param values: the numbers, they are not modified
+    :return: the bytes of the numbers
+    """
+    if sys.byteorder == "big":
+        values = values[:]
+        values.byteswap()
+    return values.tobytes()
@@ -1,8 +1,113 @@
 from __future__ import annotations
 
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from concurrent.futures import Executor
+from heapq import heappop, heappush
+from itertools import count
+from time import perf_counter
+from typing import Callable, Hashable, Iterator
+
+# Rows at least this wide are searched on an IntervalArrayWrapper, whose free space queries take O(log n)
+WIDE_ROW_THRESHOLD = 256
+
+# The depth-first recursion of the original algorithm
+ENGINE_DFS = "dfs"
+# A best-first search over the obj positions that clears the cheapest position first
+ENGINE_BEST_FIRST = "best_first"
+# The same search as ENGINE_DFS on an explicit stack, so it is not limited by the recursion limit
+ENGINE_ITERATIVE = "iterative"
+
+# Rows at least this wide are searched with the help of the process pool, if the SortInventory is given one
+PARALLEL_ROW_THRESHOLD = 512
+# The amount of nested branches whose right side is handed to the process pool, deeper branches are searched where
+# they are found
+PARALLEL_DEPTH = 3
+
+# The first id of a NameTable that does not fit into an array('H') anymore
+ID_LIMIT_SHORT = 1 << 16
+
+HASH_MASK = (1 << 64) - 1
+
+
+def zobrist_key(value: Hashable, start: int) -> int:
+    """
+    Calculates the pseudo random 64-bit key of an item starting at the given position. The hash of a row is the xor of
+    the keys of all its items, so moving an item only has to xor out its old key and xor in its new one.
+
+    :param value: the name (or id) of the item
+    :param start: the starting position of the item
+    :return: the key of the item at that position
+    """
+    # The tuple hash mixes both values well enough and is a lot cheaper than mixing them by hand
+    return hash((value, start)) & HASH_MASK
+
+
+def runs_to_list(runs: list[tuple[str | None, int]]) -> list[str | None]:
+    """
+    Expands the compact description of an array created by ArrayWrapper.to_runs() again.
+
+    :param runs: the name (or None) and the length of every run of equal values from left to right
+    :return: the names (or None values) of the array
+    """
+    values: list[str | None] = []
+    for name, length in runs:
+        values += [name] * length
+    return values
+
+
+def _sort_branch(row_type: type[ArrayWrapper], input_runs: list[tuple[str | None, int]], obj_name: str,
+                 obj_width: int, table_size: int, obj_pos: int, runs: list[tuple[str | None, int]],
+                 moves: dict[str, tuple[int, int]] | None, cost: int, time_budget: float | None,
+                 node_budget: int | None) \
+        -> tuple[list[tuple[str | None, int]] | None, int, dict[str, tuple[int, int]] | None, int, bool]:
+    """
+    Searches a single branch of a SortInventory in a worker process of its process pool. The arrays are passed as runs,
+    so only a few entries per item have to be sent between the processes.
+
+    :param row_type: the kind of array the branch is searched on
+    :param input_runs: the runs of the input_arr of the SortInventory
+    :param obj_name: The object name to insert
+    :param obj_width: the width of the object
+    :param table_size: the maximum amount of explored states remembered by the transposition table
+    :param obj_pos: the desired obj position the branch starts with
+    :param runs: the runs of the array the branch starts with
+    :param moves: the moves recorded on the array so far (None if the moves are not recorded)
+    :param cost: the costs the branch starts with
+    :param time_budget: the time in seconds the branch may take (None for no limit)
+    :param node_budget: the amount of states the branch may expand (None for no limit)
+    :return: the runs of the resulting array (None if the branch was abandoned), its costs and recorded moves, the
+             amount of expanded states and if the budget ran out
+    """
+    input_arr = row_type(runs_to_list(input_runs))
+    solver = SortInventory(obj_name, obj_width, 0, input_arr, table_size, None)
+    arr = input_arr.like(runs_to_list(runs))
+    arr.moves = moves
+    arr, cost, exhausted = solver.search_branch(obj_pos, arr, cost, time_budget, node_budget)
+    if arr is None:
+        return None, cost, None, solver.nodes_expanded, exhausted
+    return arr.to_runs(), cost, arr.moves, solver.nodes_expanded, exhausted
+
+
+# The kinds of entries in the queue of the best-first search, in the order they are taken on equal costs
+_ENTRY_EXACT = 0
+_ENTRY_BOUNDED = 1
+_ENTRY_UNBOUNDED = 2
+
+
+class _BudgetExhausted(Exception):
+    """
+    Raised inside the search once its time or node budget is used up.
+    """
+
 
 class SortInventory:
-    def __init__(self, obj_name: str, obj_width: int, obj_pos: int, input_arr: ArrayWrapper):
+    def __init__(self, obj_name: str, obj_width: int, obj_pos: int, input_arr: ArrayWrapper,
+                 table_size: int = 2 ** 16, wide_row_threshold: int | None = WIDE_ROW_THRESHOLD,
+                 engine: str = ENGINE_DFS, stats: SolverStats | None = None, pool: Executor | None = None,
+                 parallel_threshold: int = PARALLEL_ROW_THRESHOLD, parallel_depth: int = PARALLEL_DEPTH,
+                 cache: ResultCache | None = None, fast_path: bool = True):
         """
         The SortInventory class is an abstraction that bases its operation in taking in an array in the form of
         ArrayWrapper of arbitrary length. It then allows the call to sort_inventory() to get an array back
@@ -12,7 +117,23 @@ class SortInventory:
         :param obj_width: the width of the object
         :param obj_pos: the desired position of the object in the input_arr
         :param input_arr: the base array without the obj in it
+        :param table_size: the maximum amount of explored states remembered by the transposition table
+                           (0 disables the table)
+        :param wide_row_threshold: the row length from which on the search runs on an IntervalArrayWrapper
+                                   (None always searches on the given kind of array)
+        :param engine: the search to use, either ENGINE_DFS, ENGINE_BEST_FIRST or ENGINE_ITERATIVE
+        :param stats: collects statistics about every search if given (None collects nothing)
+        :param pool: a process pool (for example a concurrent.futures.ProcessPoolExecutor) that explores branches of
+                     ENGINE_DFS searches on wide rows in parallel (None searches everything in this process)
+        :param parallel_threshold: the row length from which on the pool is used
+        :param parallel_depth: the amount of nested branches whose right side is handed to the pool
+        :param cache: remembers the results of earlier searches, so searching the same thing again is skipped (None
+                      to always search)
+        :param fast_path: if pushing the items under the obj to one side is tried first, it is taken without a search
+                          whenever no search could find anything cheaper
         """
+        if engine not in (ENGINE_DFS, ENGINE_BEST_FIRST, ENGINE_ITERATIVE):
+            raise ValueError(f"unknown engine {engine!r}")
         self.obj_name = obj_name
         self.obj_width = obj_width
         if obj_pos < 0:
@@ -21,16 +142,213 @@ class SortInventory:
         self.input_arr = input_arr
         self.__MAX_COST = 2 ** 63
         self.COST_ABANDON = 2 * len(input_arr)
-
-    def sort_inventory(self) -> ArrayWrapper:
+        self.table_size = table_size
+        self.table: TranspositionTable | None = None
+        self.wide_row_threshold = wide_row_threshold
+        self.engine = engine
+        self.stats = stats
+        self.pool = pool
+        self.parallel_threshold = parallel_threshold
+        self.parallel_depth = parallel_depth
+        self.cache = cache
+        self.fast_path = fast_path
+        # The amount of nested branches the running search may still hand to the pool and the runs of the input_arr
+        # sent along with them
+        self.forks_left = 0
+        self.input_runs: list[tuple[str | None, int]] | None = None
+        # The amount of states the last search has expanded, the cost of its result and if the search finished
+        # within its budget, so that no cheaper result exists
+        self.nodes_expanded = 0
+        self.cost = 0
+        self.proven_optimal = False
+        # The budget of the running search and the cheapest result it has found so far
+        self.budgeted = False
+        self.node_budget: int | None = None
+        self.deadline: float | None = None
+        self.best: tuple[ArrayWrapper, int] | None = None
+
+    def sort_inventory(self, time_budget: float | None = None, node_budget: int | None = None) -> ArrayWrapper:
         """
-        Sorts the given obj into the array.
+        Sorts the given obj into the array. If a budget is given the search stops once it is used up and the cheapest
+        result found so far is returned, proven_optimal tells afterwards if the search could finish.
 
+        :param time_budget: the time in seconds the search may take (None for no limit)
+        :param node_budget: the amount of states the search may expand (None for no limit)
         :return: a newly generated version of the array with the obj inserted
         """
-        arr, _ = self._sort_inventory(self.obj_pos, self.input_arr.copy())
+        arr, _ = self._solve(False, time_budget, node_budget)
         return arr
 
+    def sort_inventory_with_changes(self, time_budget: float | None = None, node_budget: int | None = None) \
+            -> tuple[ArrayWrapper, dict[str, int]]:
+        """
+        Sorts the given obj into the array and records every item the algorithm moves while doing so, so the changes
+        don't have to be found by comparing the arrays afterwards.
+
+        :param time_budget: the time in seconds the search may take (None for no limit)
+        :param node_budget: the amount of states the search may expand (None for no limit)
+        :return: a newly generated version of the array with the obj inserted and a dictionary of items that have
+                 moved (including the obj) and what starting position the item has now
+        """
+        return self._solve(True, time_budget, node_budget)
+
+    def evaluate(self, time_budget: float | None = None, node_budget: int | None = None) \
+            -> tuple[bool, int, int, bool]:
+        """
+        Searches the cheapest way to sort the given obj into the array like sort_inventory(), but only reports how
+        expensive it would be. The search still builds the resulting array, but it is neither converted back to the
+        kind of the given array nor remembered in the cache nor returned, and no changes are recorded, so many
+        positions or arrays can be compared before one of them is actually sorted.
+
+        :param time_budget: the time in seconds the search may take (None for no limit)
+        :param node_budget: the amount of states the search may expand (None for no limit)
+        :return: If the obj fits into the array, the costs of inserting it, the amount of items that would move
+                 (the obj itself not included) and if the costs are proven to be the lowest possible, which is not
+                 the case if the budget ran out, the costs and the amount are 0 if the obj does not fit
+        """
+        started = perf_counter()
+        if self.input_arr.free_spaces() < self.obj_width:
+            return False, 0, 0, True
+
+        cached = self.cache.get(self._cache_key(), False) if self.cache is not None else None
+        if cached is not None:
+            searched_arr, arr, self.cost = self.input_arr, cached[0], cached[2]
+            self.nodes_expanded = 0
+            self.proven_optimal = True
+            if self.stats is not None:
+                self.stats.cached += 1
+        else:
+            searched_arr, arr = self._search(False, started, time_budget, node_budget)
+        if self.stats is not None:
+            self.stats.record_solve(self, perf_counter() - started)
+
+        if self.cost >= self.__MAX_COST:
+            return False, 0, 0, self.proven_optimal
+        return True, self.cost, searched_arr.count_moved(arr), self.proven_optimal
+
+    def _solve(self, record_moves: bool, time_budget: float | None = None, node_budget: int | None = None) \
+            -> tuple[ArrayWrapper, dict[str, int]]:
+        """
+        Runs the sorting algorithm on a copy of the input_arr.
+
+        :param record_moves: if the moves of the items should be recorded
+        :param time_budget: the time in seconds the search may take (None for no limit)
+        :param node_budget: the amount of states the search may expand (None for no limit)
+        :return: the newly generated array and the moved items with their new starting position (empty if the moves
+                 are not recorded)
+        """
+        started = perf_counter()
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self._cache_key()
+            cached = self.cache.get(cache_key, record_moves)
+            if cached is not None:
+                arr, changes, self.cost = cached
+                self.nodes_expanded = 0
+                self.proven_optimal = True
+                if self.stats is not None:
+                    self.stats.cached += 1
+                    self.stats.record_solve(self, perf_counter() - started)
+                return arr, changes if changes is not None else {}
+
+        _, arr = self._search(record_moves, started, time_budget, node_budget)
+        changes = arr.take_changes() if record_moves else {}
+
+        # The result has to be of the same kind as the given array again
+        if type(arr) is not type(self.input_arr):
+            arr = self.input_arr.like(arr.to_list())
+
+        # A result cut short by the budget may not be the cheapest one, so it is not remembered
+        if cache_key is not None and self.proven_optimal:
+            self.cache.put(cache_key, arr, changes if record_moves else None, self.cost)
+
+        if self.stats is not None:
+            self.stats.record_solve(self, perf_counter() - started)
+        return arr, changes
+
+    def _cache_key(self) -> Hashable:
+        """
+        Creates the key the result of the search is remembered by in the cache. The settings that can change which
+        of several equally cheap layouts is found are part of the key, so differently configured solvers sharing a
+        cache never get each other's results.
+
+        :return: a key that is equal for all searches with the same settings inserting the same obj into the same
+                 array
+        """
+        return (type(self.input_arr), self.input_arr.state_key(), self.obj_name, self.obj_width, self.obj_pos,
+                self.engine, self.fast_path, self.wide_row_threshold, self.table_size)
+
+    def _search(self, record_moves: bool, started: float, time_budget: float | None, node_budget: int | None) \
+            -> tuple[ArrayWrapper, ArrayWrapper]:
+        """
+        Runs the search on a copy of the input_arr and notes the costs of the result and if it is proven optimal.
+        Wide rows are searched on an IntervalArrayWrapper, so the result is not necessarily of the same kind as the
+        input_arr.
+
+        :param record_moves: if the moves of the items should be recorded
+        :param started: the point in time (from perf_counter) the search was started at
+        :param time_budget: the time in seconds the search may take (None for no limit)
+        :param node_budget: the amount of states the search may expand (None for no limit)
+        :return: the array the search started from and the newly generated array, both of the kind that was searched
+        """
+        # The budget includes the preparation of the search
+        self.deadline = started + time_budget if time_budget is not None else None
+        base_arr = self.input_arr
+        # Only the plain list rows profit from the conversion, the compact backends are fast enough on their own
+        if (self.wide_row_threshold is not None and len(base_arr) >= self.wide_row_threshold
+                and type(base_arr) is ArrayWrapper):
+            self.input_arr = IntervalArrayWrapper(base_arr.to_list())
+        searched_arr = self.input_arr
+
+        self.nodes_expanded = 0
+        self.budgeted = time_budget is not None or node_budget is not None
+        self.node_budget = node_budget
+        try:
+            # Calculate the hash once up front, all copies made during the search inherit and update it
+            _ = searched_arr.state_hash
+            start_arr = searched_arr.copy()
+            if record_moves:
+                start_arr.moves = {}
+
+            fast = self._try_fast_path(start_arr) if self.fast_path else None
+            # With a budget the search can stop at any time, so there always has to be a valid result to fall back on
+            self.best = self._pack_around(start_arr) if self.budgeted and fast is None else None
+            result = fast
+            if result is None and self.engine == ENGINE_BEST_FIRST:
+                result = self._best_first(start_arr)
+            if result is None:
+                self.table = TranspositionTable(self.table_size) if self.table_size > 0 else None
+                if self.engine == ENGINE_ITERATIVE:
+                    result = self._sort_iteratively(self.obj_pos, start_arr)
+                else:
+                    if self.pool is not None and len(start_arr) >= self.parallel_threshold:
+                        self.forks_left = self.parallel_depth
+                        self.input_runs = searched_arr.to_runs()
+                    result = self._sort_inventory(self.obj_pos, start_arr)
+            self.proven_optimal = True
+        except _BudgetExhausted:
+            result = self.best if self.best is not None else (start_arr, self.__MAX_COST)
+            self.proven_optimal = False
+        finally:
+            self.table = None
+            self.best = None
+            self.budgeted = False
+            self.forks_left = 0
+            self.input_runs = None
+            # The solver always ends up holding the array it was given, even if the search failed
+            self.input_arr = base_arr
+
+        # The search can get stuck moving the items back and forth without ever making space, pushing the items aside
+        # works whenever the obj fits at all
+        if result[1] >= self.__MAX_COST:
+            fallback_arr = searched_arr.copy()
+            if record_moves:
+                fallback_arr.moves = {}
+            result = self._pack_around(fallback_arr) or result
+            self.proven_optimal = False
+        arr, self.cost = result
+        return searched_arr, arr
+
     def _sort_inventory(self, obj_pos: int, input_arr: ArrayWrapper, cost: int = 0) -> tuple[ArrayWrapper, int]:
         """
         The underlying recursive function to allow for cost-effective sorting. It actually implements the
@@ -41,21 +359,22 @@ class SortInventory:
         :param cost: the already incurred costs from former operations on the array
         :return: the newly modified input_arr and the newly calculated costs
         """
-        # If the costs are bigger than twice the length of the array or the input_arr has the same configuration as
-        # the base array, there is no sense in pursing this version of the input_arr further, return the object with
-        # extreme cost, so it will not be chosen.
-        if cost > self.COST_ABANDON or (cost > 0 and input_arr.equal(self.input_arr)):
+        if self._is_dead_end(obj_pos, input_arr, cost):
             return input_arr, self.__MAX_COST
 
         all_free = False
         while not all_free:
             # If the obj_pos would move out of bounds the result is obviously invalid, so the algorithm should
             # abound this approach too.
-            if obj_pos >= len(input_arr) or obj_pos < 0:
+            if obj_pos + self.obj_width > len(input_arr) or obj_pos < 0:
+                if self.stats is not None:
+                    self.stats.abandoned_out_of_bounds += 1
                 return input_arr, self.__MAX_COST
 
             # Try to make free space under the object itself
             obj_pos, input_arr, cost = self._try_reordering(obj_pos, input_arr, cost)
+            if cost >= self.__MAX_COST:
+                return input_arr, self.__MAX_COST
 
             all_free = input_arr.all_free(self.obj_name, self.obj_width, obj_pos)
 
@@ -70,21 +389,64 @@ class SortInventory:
                     obj_pos += 1
                 else:
                     # If the possibility exists that the item can move in both directions try which is cheaper
-                    in_right, cost_right = self._sort_inventory(obj_pos + 1, input_arr.copy(), cost)
-                    in_left, cost_left = self._sort_inventory(obj_pos - 1, input_arr.copy(), cost)
-                    if cost_left > cost_right:
-                        input_arr = in_right
-                        cost = cost_right
-                    else:
-                        input_arr = in_left
-                        cost = cost_left
+                    if self.stats is not None:
+                        self.stats.sort_branches += 1
+                        self.stats.copies += 2
+                    input_arr, cost = self._sort_both((obj_pos + 1, input_arr.copy(), cost),
+                                                      (obj_pos - 1, input_arr.copy(), cost))
+                    # If both branches were abandoned this version of the input_arr is abandoned as well
+                    if cost >= self.__MAX_COST:
+                        return input_arr, self.__MAX_COST
 
             all_free = input_arr.all_free(self.obj_name, self.obj_width, obj_pos)
 
-        # After successfully making space, the obj can be safely inserted
+        self._insert(obj_pos, input_arr, cost)
+        return input_arr, cost
+
+    def _is_dead_end(self, obj_pos: int, input_arr: ArrayWrapper, cost: int) -> bool:
+        """
+        Counts the newly entered state and checks if searching on from it is pointless.
+
+        :param obj_pos: the current desired obj position
+        :param input_arr: the input_arr of the state
+        :param cost: the already incurred costs from former operations on the array
+        :return: if the state should be abandoned
+        """
+        self.nodes_expanded += 1
+        if self.budgeted:
+            self._check_budget()
+        # If the costs are bigger than twice the length of the array or the input_arr has the same configuration as
+        # the base array, there is no sense in pursing this version of the input_arr further, return the object with
+        # extreme cost, so it will not be chosen.
+        if cost > self.COST_ABANDON:
+            if self.stats is not None:
+                self.stats.abandoned_cost += 1
+            return True
+        if cost > 0 and input_arr.equal(self.input_arr):
+            if self.stats is not None:
+                self.stats.abandoned_equal += 1
+            return True
+        # A state that was already reached with the same or lower costs can not produce a cheaper result than the
+        # branch that reached it first, so it can be abandoned too.
+        if self.table is not None and self.table.is_known(input_arr.state_hash, obj_pos, cost):
+            if self.stats is not None:
+                self.stats.abandoned_known += 1
+            return True
+        return False
+
+    def _insert(self, obj_pos: int, input_arr: ArrayWrapper, cost: int) -> None:
+        """
+        Inserts the obj after space was successfully made for it.
+
+        :param obj_pos: the position to insert the obj at
+        :param input_arr: the input_arr to insert the obj into
+        :param cost: the costs of the result
+        """
         input_arr.add_item(self.obj_name, self.obj_width, obj_pos)
 
-        return input_arr, cost
+        # Remember the cheapest result in case the budget runs out before the search finishes
+        if self.budgeted and (self.best is None or cost < self.best[1]):
+            self.best = input_arr.copy(), cost
 
     def _try_reordering(self, obj_pos: int, input_arr: ArrayWrapper, cost: int) \
             -> tuple[int, ArrayWrapper, int]:
@@ -109,22 +471,42 @@ class SortInventory:
                 # Both
                 case 0:
                     input_arr, cost, target = self._recursively_resolve_order(obj_pos, input_arr, cost, target)
+                    # Moving the items back and forth can not be resolved, so stop once it got too expensive
+                    if cost > self.COST_ABANDON:
+                        if self.stats is not None and cost < self.__MAX_COST:
+                            self.stats.abandoned_cost += 1
+                        return obj_pos, input_arr, self.__MAX_COST
                     free_left, free_right = input_arr.calc_free(self.obj_width, obj_pos)
                 # Right
                 case 1:
                     if free_right > 0:
-                        cost += input_arr.move_right(target)
-                        free_right -= 1
+                        start, end = input_arr.item_span(target)
+                        steps = 1
+                        # An item reaching over the right edge of the object keeps being moved right until it is
+                        # out of the way, so push it there in one go
+                        if end > obj_pos + self.obj_width:
+                            steps = min(free_right, obj_pos + self.obj_width - start)
+                        cost += input_arr.shift_right(target, steps)
+                        free_right -= steps
+                        if self.stats is not None:
+                            self.stats.moves += 1
                     else:
                         target += 1
                 # Left
                 case -1:
                     if free_left > 0:
-                        cost += input_arr.move_left(target)
-                        free_left -= 1
-
-                        if target != obj_pos:
-                            target -= 1
+                        start, end = input_arr.item_span(target)
+                        steps = 1
+                        # An item reaching over the left edge of the object keeps being moved left until it is
+                        # out of the way, so push it there in one go
+                        if start < obj_pos:
+                            steps = min(free_left, end - obj_pos)
+                        cost += input_arr.shift_left(target, steps)
+                        free_left -= steps
+                        if self.stats is not None:
+                            self.stats.moves += 1
+
+                        target = max(target - steps, obj_pos)
                     else:
                         target += 1
 
@@ -148,22 +530,652 @@ class SortInventory:
             cost += input_arr.move_left(target)
             if target != obj_pos:
                 target -= 1
+            if self.stats is not None:
+                self.stats.moves += 1
         elif free_right > 0 >= free_left:
             cost += input_arr.move_right(target)
+            if self.stats is not None:
+                self.stats.moves += 1
+        elif free_left <= 0:
+            # Neither side has any free space left, so the targeted field can not be cleaned
+            if self.stats is not None:
+                self.stats.abandoned_blocked += 1
+            return input_arr, self.__MAX_COST, target
         else:
-            temp_arr_right, temp_cost = input_arr.move_right_copy(target)
-            in_right, cost_right = self._sort_inventory(obj_pos, temp_arr_right, cost + temp_cost)
-            temp_arr_left, temp_cost = input_arr.move_left_copy(target)
-            in_left, cost_left = self._sort_inventory(obj_pos, temp_arr_left, cost + temp_cost)
-            if cost_left > cost_right:
-                return in_right, cost_right, target
-            else:
-                return in_left, cost_left, target
+            if self.stats is not None:
+                self.stats.resolve_branches += 1
+                self.stats.copies += 2
+            temp_arr_right, temp_cost_right = input_arr.move_right_copy(target)
+            temp_arr_left, temp_cost_left = input_arr.move_left_copy(target)
+            input_arr, cost = self._sort_both((obj_pos, temp_arr_right, cost + temp_cost_right),
+                                              (obj_pos, temp_arr_left, cost + temp_cost_left))
 
         return input_arr, cost, target
 
+    def _sort_both(self, right: tuple[int, ArrayWrapper, int], left: tuple[int, ArrayWrapper, int]) \
+            -> tuple[ArrayWrapper, int]:
+        """
+        Explores the branch to the right and the branch to the left and takes the cheaper one (the left one if both
+        cost the same). In the parallel mode the right branch is searched by the process pool while the left branch is
+        searched here at the same time. The branches do not share their transposition table then, so on a tie a
+        different result than in the sequential search can be chosen.
+
+        :param right: the obj position, the array and the costs the right branch starts with
+        :param left: the obj position, the array and the costs the left branch starts with
+        :return: the array and the costs of the cheaper branch
+        """
+        if self.forks_left <= 0:
+            in_right, cost_right = self._sort_inventory(*right)
+            in_left, cost_left = self._sort_inventory(*left)
+        else:
+            future = self.pool.submit(_sort_branch, *self._branch_task(*right))
+            self.forks_left -= 1
+            try:
+                in_left, cost_left = self._sort_inventory(*left)
+            except _BudgetExhausted:
+                future.cancel()
+                raise
+            finally:
+                self.forks_left += 1
+            in_right, cost_right = self._branch_result(*future.result())
+
+        if cost_left > cost_right:
+            return in_right, cost_right
+        return in_left, cost_left
+
+    def _branch_task(self, obj_pos: int, input_arr: ArrayWrapper, cost: int) -> tuple:
+        """
+        Creates the arguments of _sort_branch() for a branch that is handed to the process pool.
+
+        :param obj_pos: the obj position the branch starts with
+        :param input_arr: the array the branch starts with
+        :param cost: the costs the branch starts with
+        :return: the arguments of _sort_branch()
+        """
+        time_budget = max(0.0, self.deadline - perf_counter()) if self.deadline is not None else None
+        node_budget = self.node_budget - self.nodes_expanded if self.node_budget is not None else None
+        return (type(self.input_arr), self.input_runs, self.obj_name, self.obj_width, self.table_size, obj_pos,
+                input_arr.to_runs(), input_arr.moves, cost, time_budget, node_budget)
+
+    def _branch_result(self, runs: list[tuple[str | None, int]] | None, cost: int,
+                       moves: dict[str, tuple[int, int]] | None, nodes_expanded: int, exhausted: bool) \
+            -> tuple[ArrayWrapper, int]:
+        """
+        Takes over the result of a branch that was searched by the process pool.
+
+        :param runs: the runs of the resulting array (None if the branch was abandoned)
+        :param cost: the costs of the result
+        :param moves: the moves recorded on the resulting array
+        :param nodes_expanded: the amount of states the branch has expanded
+        :param exhausted: if the budget ran out while searching the branch
+        :return: the resulting array and its costs
+        """
+        self.nodes_expanded += nodes_expanded
+        if runs is None:
+            arr, cost = self.input_arr, self.__MAX_COST
+        else:
+            arr = self.input_arr.like(runs_to_list(runs))
+            arr.moves = moves
+            if self.budgeted and (self.best is None or cost < self.best[1]):
+                self.best = arr.copy(), cost
+        if exhausted:
+            raise _BudgetExhausted()
+        return arr, cost
+
+    def search_branch(self, obj_pos: int, input_arr: ArrayWrapper, cost: int, time_budget: float | None = None,
+                      node_budget: int | None = None) -> tuple[ArrayWrapper | None, int, bool]:
+        """
+        Searches a single branch of the search, the way _sort_inventory() does. This is what a worker process of the
+        parallel mode runs.
+
+        :param obj_pos: the desired obj position the branch starts with
+        :param input_arr: the array the branch starts with, it gets modified
+        :param cost: the costs the branch starts with
+        :param time_budget: the time in seconds the branch may take (None for no limit)
+        :param node_budget: the amount of states the branch may expand (None for no limit)
+        :return: the resulting array (None if the branch was abandoned), its costs and if the budget ran out (the
+                 result is the cheapest one found until then)
+        """
+        self.deadline = perf_counter() + time_budget if time_budget is not None else None
+        self.nodes_expanded = 0
+        self.budgeted = time_budget is not None or node_budget is not None
+        self.node_budget = node_budget
+        self.best = None
+        self.table = TranspositionTable(self.table_size) if self.table_size > 0 else None
+        exhausted = False
+        try:
+            result = self._sort_inventory(obj_pos, input_arr, cost)
+        except _BudgetExhausted:
+            result = self.best if self.best is not None else (input_arr, self.__MAX_COST)
+            exhausted = True
+        finally:
+            self.table = None
+            self.best = None
+            self.budgeted = False
+
+        if result[1] >= self.__MAX_COST:
+            return None, result[1], exhausted
+        return result[0], result[1], exhausted
+
+    def _sort_iteratively(self, obj_pos: int, input_arr: ArrayWrapper) -> tuple[ArrayWrapper, int]:
+        """
+        Runs the same search as _sort_inventory(), _try_reordering() and _recursively_resolve_order() together, but
+        keeps the calls on an explicit stack of SearchFrames instead of the call stack. A frame stands for one call of
+        _sort_inventory() including the _try_reordering() it runs, the branches are explored in the same order and
+        chosen the same way, so both return the same result.
+
+        :param obj_pos: the desired obj position
+        :param input_arr: the input_arr to modify
+        :return: the newly modified input_arr and the newly calculated costs
+        """
+        max_cost = self.__MAX_COST
+        stack = [SearchFrame(obj_pos, input_arr, 0)]
+        # The result of the last finished frame, handed to the frame below it
+        result_arr, result_cost = input_arr, max_cost
+
+        while stack:
+            frame = stack[-1]
+            phase = frame.phase
+            done = False
+
+            if phase == SearchFrame.ENTER:
+                if self._is_dead_end(frame.obj_pos, frame.arr, frame.cost):
+                    frame.cost = max_cost
+                    done = True
+                else:
+                    phase = SearchFrame.NEXT_ROUND
+
+            elif phase == SearchFrame.RESOLVED_RIGHT:
+                # The right branch of _recursively_resolve_order() has finished, explore the left branch
+                frame.other_arr, frame.other_cost = result_arr, result_cost
+                temp_arr, temp_cost = frame.arr.move_left_copy(frame.target)
+                frame.phase = SearchFrame.RESOLVED_LEFT
+                stack.append(SearchFrame(frame.obj_pos, temp_arr, frame.cost + temp_cost))
+                continue
+
+            elif phase == SearchFrame.RESOLVED_LEFT:
+                if result_cost > frame.other_cost:
+                    frame.arr, frame.cost = frame.other_arr, frame.other_cost
+                else:
+                    frame.arr, frame.cost = result_arr, result_cost
+                frame.other_arr = None
+                # Moving the items back and forth can not be resolved, so stop once it got too expensive
+                if frame.cost > self.COST_ABANDON:
+                    if self.stats is not None and frame.cost < max_cost:
+                        self.stats.abandoned_cost += 1
+                    frame.cost = max_cost
+                    done = True
+                else:
+                    frame.free_left, frame.free_right = frame.arr.calc_free(self.obj_width, frame.obj_pos)
+                    phase = SearchFrame.REORDER
+
+            elif phase == SearchFrame.MOVED_RIGHT:
+                # The branch moving the obj right has finished, explore the branch moving it left
+                frame.other_arr, frame.other_cost = result_arr, result_cost
+                frame.phase = SearchFrame.MOVED_LEFT
+                stack.append(SearchFrame(frame.obj_pos - 1, frame.arr.copy(), frame.cost))
+                continue
+
+            elif phase == SearchFrame.MOVED_LEFT:
+                if result_cost > frame.other_cost:
+                    frame.arr, frame.cost = frame.other_arr, frame.other_cost
+                else:
+                    frame.arr, frame.cost = result_arr, result_cost
+                frame.other_arr = None
+                # If both branches were abandoned this version of the input_arr is abandoned as well
+                if frame.cost >= max_cost:
+                    done = True
+                elif frame.arr.all_free(self.obj_name, self.obj_width, frame.obj_pos):
+                    self._insert(frame.obj_pos, frame.arr, frame.cost)
+                    done = True
+                else:
+                    phase = SearchFrame.NEXT_ROUND
+
+            if not done:
+                if phase == SearchFrame.NEXT_ROUND:
+                    # If the obj_pos would move out of bounds the result is obviously invalid
+                    if frame.obj_pos + self.obj_width > len(frame.arr) or frame.obj_pos < 0:
+                        if self.stats is not None:
+                            self.stats.abandoned_out_of_bounds += 1
+                        frame.cost = max_cost
+                        done = True
+                    else:
+                        frame.free_left, frame.free_right = frame.arr.calc_free(self.obj_width, frame.obj_pos)
+                        frame.target = frame.obj_pos
+                        phase = SearchFrame.REORDER
+                if phase == SearchFrame.REORDER:
+                    phase, done = self._reorder_frame(frame)
+                    if phase == SearchFrame.RESOLVED_RIGHT or phase == SearchFrame.MOVED_RIGHT:
+                        if phase == SearchFrame.RESOLVED_RIGHT:
+                            temp_arr, temp_cost = frame.arr.move_right_copy(frame.target)
+                            stack.append(SearchFrame(frame.obj_pos, temp_arr, frame.cost + temp_cost))
+                        else:
+                            stack.append(SearchFrame(frame.obj_pos + 1, frame.arr.copy(), frame.cost))
+                        frame.phase = phase
+                        continue
+
+            if done:
+                stack.pop()
+                result_arr, result_cost = frame.arr, frame.cost
+            else:
+                frame.phase = phase
+
+        return result_arr, result_cost
+
+    def _reorder_frame(self, frame: SearchFrame) -> tuple[int, bool]:
+        """
+        Continues the work of _try_reordering() and the rest of the loop of _sort_inventory() on the frame until
+        either a branch has to be explored or the frame is finished.
+
+        :param frame: the frame to work on
+        :return: the phase the frame has to continue with (REORDER to go on with the next round, RESOLVED_RIGHT or
+                 MOVED_RIGHT if the right branch has to be explored first) and if the frame is finished
+        """
+        obj_pos = frame.obj_pos
+        input_arr = frame.arr
+        cost = frame.cost
+        free_left, free_right = frame.free_left, frame.free_right
+        target = frame.target
+
+        while target < obj_pos + self.obj_width:
+            if input_arr.is_free(target, self.obj_name):
+                target += 1
+                continue
+
+            match input_arr.check_allowed_move_directions(obj_pos, self.obj_width, target):
+                # Both, this is _recursively_resolve_order()
+                case 0:
+                    free_left, free_right = input_arr.calc_free(self.obj_width, obj_pos)
+                    if free_left > 0 >= free_right:
+                        cost += input_arr.move_left(target)
+                        if target != obj_pos:
+                            target -= 1
+                    elif free_right > 0 >= free_left:
+                        cost += input_arr.move_right(target)
+                    elif free_left > 0:
+                        if self.stats is not None:
+                            self.stats.resolve_branches += 1
+                            self.stats.copies += 2
+                        frame.cost, frame.target = cost, target
+                        return SearchFrame.RESOLVED_RIGHT, False
+                    else:
+                        # Neither side has any free space left, so the targeted field can not be cleaned
+                        if self.stats is not None:
+                            self.stats.abandoned_blocked += 1
+                        frame.cost = self.__MAX_COST
+                        return SearchFrame.REORDER, True
+                    if self.stats is not None:
+                        self.stats.moves += 1
+                    if cost > self.COST_ABANDON:
+                        if self.stats is not None:
+                            self.stats.abandoned_cost += 1
+                        frame.cost = self.__MAX_COST
+                        return SearchFrame.REORDER, True
+                    free_left, free_right = input_arr.calc_free(self.obj_width, obj_pos)
+                # Right
+                case 1:
+                    if free_right > 0:
+                        start, end = input_arr.item_span(target)
+                        steps = 1
+                        if end > obj_pos + self.obj_width:
+                            steps = min(free_right, obj_pos + self.obj_width - start)
+                        cost += input_arr.shift_right(target, steps)
+                        free_right -= steps
+                        if self.stats is not None:
+                            self.stats.moves += 1
+                    else:
+                        target += 1
+                # Left
+                case -1:
+                    if free_left > 0:
+                        start, end = input_arr.item_span(target)
+                        steps = 1
+                        if start < obj_pos:
+                            steps = min(free_left, end - obj_pos)
+                        cost += input_arr.shift_left(target, steps)
+                        free_left -= steps
+                        if self.stats is not None:
+                            self.stats.moves += 1
+                        target = max(target - steps, obj_pos)
+                    else:
+                        target += 1
+
+        frame.target = target
+        frame.cost = cost
+        # The rest of the round of _sort_inventory(), if there is no space yet move the obj itself
+        if not input_arr.all_free(self.obj_name, self.obj_width, obj_pos):
+            frame.cost += 2
+            free_left, free_right = input_arr.calc_free(self.obj_width, obj_pos)
+            if free_left > 0 >= free_right:
+                obj_pos -= 1
+            elif free_right > 0 >= free_left:
+                obj_pos += 1
+            else:
+                if self.stats is not None:
+                    self.stats.sort_branches += 1
+                    self.stats.copies += 2
+                return SearchFrame.MOVED_RIGHT, False
+            frame.obj_pos = obj_pos
+            if not input_arr.all_free(self.obj_name, self.obj_width, obj_pos):
+                return SearchFrame.NEXT_ROUND, False
+
+        self._insert(obj_pos, input_arr, frame.cost)
+        return SearchFrame.REORDER, True
+
+    def _best_first(self, input_arr: ArrayWrapper) -> tuple[ArrayWrapper, int] | None:
+        """
+        Searches the cheapest way to make space for the obj by always looking at the obj position with the lowest
+        costs first. Moving the obj to a position costs 2 per space and making space there costs at least the
+        _lower_bound() of it, the position with the lowest sum is cleared by _expand() and goes back into the queue
+        with its exact costs. The first exact entry taken from the queue is the cheapest result, because the lower
+        bound never overestimates. A position only counts as expanded once it is cleared, like a call of
+        _sort_inventory(), and the positions further away are only looked at once the costs of moving the obj there
+        are reached.
+
+        :param input_arr: the input_arr to start from, it is not modified
+        :return: a copy of the input_arr with the obj inserted and the costs, or None if no result was found within
+                 COST_ABANDON
+        """
+        tie_breaker = count()
+        # The estimated or exact costs, the kind of the entry, the tie breaker, the obj position and the result if the
+        # costs are exact. On equal costs the exact results come first, then the positions whose lower bound is known
+        # and finally the positions only the costs of moving the obj there are known of.
+        queue: list[tuple[int, int, int, int, tuple[ArrayWrapper, int] | None]] = [
+            (0, _ENTRY_UNBOUNDED, next(tie_breaker), self.obj_pos, None)]
+        last_pos = len(input_arr) - self.obj_width
+
+        while queue:
+            _, kind, _, obj_pos, result = heappop(queue)
+            if self.budgeted:
+                self._check_budget()
+            if kind == _ENTRY_EXACT:
+                return result
+            move_cost = 2 * abs(obj_pos - self.obj_pos)
+
+            if kind == _ENTRY_UNBOUNDED:
+                lower_bound = self._lower_bound(obj_pos, input_arr)
+                if lower_bound is not None:
+                    heappush(queue, (move_cost + lower_bound, _ENTRY_BOUNDED, next(tie_breaker), obj_pos, None))
+                elif self.stats is not None:
+                    self.stats.abandoned_blocked += 1
+                # The next position in the same direction, both directions from the desired position
+                for next_pos in (obj_pos - 1, obj_pos + 1):
+                    if (0 <= next_pos <= last_pos and abs(next_pos - self.obj_pos) > abs(obj_pos - self.obj_pos)
+                            and move_cost + 2 <= self.COST_ABANDON):
+                        heappush(queue, (move_cost + 2, _ENTRY_UNBOUNDED, next(tie_breaker), next_pos, None))
+                continue
+
+            self.nodes_expanded += 1
+            cleared = self._expand(obj_pos, input_arr)
+            if cleared is None:
+                if self.stats is not None:
+                    self.stats.abandoned_blocked += 1
+                continue
+            arr, cost = cleared
+            cost += move_cost
+            if cost > self.COST_ABANDON:
+                if self.stats is not None:
+                    self.stats.abandoned_cost += 1
+                continue
+            arr.add_item(self.obj_name, self.obj_width, obj_pos)
+            if self.budgeted and (self.best is None or cost < self.best[1]):
+                self.best = arr.copy(), cost
+            heappush(queue, (cost, _ENTRY_EXACT, next(tie_breaker), obj_pos, (arr, cost)))
+        return None
+
+    def _window_items(self, obj_pos: int, input_arr: ArrayWrapper) -> list[tuple[int, int]]:
+        """
+        Finds the items under the obj.
+
+        :param obj_pos: the obj position
+        :param input_arr: the current array
+        :return: the starting position and the position right after the end of every item under the obj, from left
+                 to right
+        """
+        spans: list[tuple[int, int]] = []
+        pos = obj_pos
+        while pos < obj_pos + self.obj_width:
+            if input_arr.is_free(pos, self.obj_name):
+                pos += 1
+                continue
+            spans.append(input_arr.item_span(pos))
+            pos = spans[-1][1]
+        return spans
+
+    def _push_cost(self, pos: int, steps: int, input_arr: ArrayWrapper, left: bool) -> int | None:
+        """
+        Calculates the costs of pushing an item to one side without copying the array, the same way shift_left() and
+        shift_right() push the items in its way along.
+
+        :param pos: a position of the item to push
+        :param steps: how far to push the item
+        :param input_arr: the current array
+        :param left: if the item is pushed to the left
+        :return: the costs of the push, or None if there is not enough space on that side
+        """
+        cost = 0
+        start, end = input_arr.item_span(pos)
+        while steps > 0:
+            cost += steps
+            pos = start - 1 if left else end
+            while steps > 0 and 0 <= pos < len(input_arr) and input_arr.is_free(pos, self.obj_name):
+                steps -= 1
+                pos += -1 if left else 1
+            if steps == 0:
+                break
+            if not 0 <= pos < len(input_arr):
+                return None
+            start, end = input_arr.item_span(pos)
+        return cost
+
+    def _split_costs(self, obj_pos: int, spans: list[tuple[int, int]],
+                     input_arr: ArrayWrapper) -> list[int | None]:
+        """
+        Calculates the costs of every split of the items under the obj between both sides. The items keep their
+        order, so for a split the last item before it is pushed left until its end reaches the obj and the first item
+        after it is pushed right until its start reaches the end of the obj, both with the items in their way.
+
+        :param obj_pos: the obj position
+        :param spans: the items under the obj from _window_items()
+        :param input_arr: the current array
+        :return: the costs of every split or None if it does not fit, the amount of items pushed to the left is the
+                 index
+        """
+        obj_end = obj_pos + self.obj_width
+        costs: list[int | None] = []
+        for split in range(len(spans) + 1):
+            cost = 0
+            if split > 0:
+                start, end = spans[split - 1]
+                cost = self._push_cost(start, end - obj_pos, input_arr, True)
+            if split < len(spans) and cost is not None:
+                start, end = spans[split]
+                right_cost = self._push_cost(start, obj_end - start, input_arr, False)
+                cost = None if right_cost is None else cost + right_cost
+            costs.append(cost)
+        return costs
+
+    def _expand(self, obj_pos: int, input_arr: ArrayWrapper) -> tuple[ArrayWrapper, int] | None:
+        """
+        Makes space for the obj at the given position the way _try_reordering() does, by pushing the items under it as
+        whole blocks to either side together with the items in their way. The cheapest split of the items under the
+        obj between both sides is used, on equal costs more items are pushed to the left.
+
+        :param obj_pos: the obj position
+        :param input_arr: the array to make space in, it is not modified
+        :return: a copy of the input_arr with space for the obj and the costs, or None if there is not enough space on
+                 the sides
+        """
+        arr = input_arr.copy()
+        if self.stats is not None:
+            self.stats.copies += 1
+        spans = self._window_items(obj_pos, input_arr)
+        if not spans:
+            return arr, 0
+        split_costs = self._split_costs(obj_pos, spans, input_arr)
+        split = None
+        for candidate in range(len(spans), -1, -1):
+            if split_costs[candidate] is not None and (split is None or split_costs[candidate] < split_costs[split]):
+                split = candidate
+        if split is None:
+            return None
+        cost = 0
+        if split > 0:
+            start, end = spans[split - 1]
+            cost += arr.shift_left(start, end - obj_pos)
+        if split < len(spans):
+            start, end = spans[split]
+            cost += arr.shift_right(start, obj_pos + self.obj_width - start)
+        return arr, cost
+
+    def _lower_bound(self, obj_pos: int, input_arr: ArrayWrapper) -> int | None:
+        """
+        Calculates the costs of making space for the obj at the given position. Any way of making space keeps the
+        order of the items, so it has to split the items under the obj between both sides and push them at least as
+        far as _split_costs() does, which makes the cheapest split a lower bound that is also reached by _expand().
+
+        :param obj_pos: the obj position
+        :param input_arr: the current array
+        :return: the lowest costs of making space for the obj, or None if no split fits
+        """
+        spans = self._window_items(obj_pos, input_arr)
+        if not spans:
+            return 0
+        costs = [cost for cost in self._split_costs(obj_pos, spans, input_arr) if cost is not None]
+        return min(costs) if costs else None
+
+    def _check_budget(self) -> None:
+        """
+        Stops the search by raising _BudgetExhausted if it has used up its time or node budget.
+        """
+        if self.node_budget is not None and self.nodes_expanded > self.node_budget:
+            raise _BudgetExhausted()
+        if self.deadline is not None and perf_counter() > self.deadline:
+            raise _BudgetExhausted()
+
+    def _try_fast_path(self, input_arr: ArrayWrapper) -> tuple[ArrayWrapper, int] | None:
+        """
+        Most insertions only need the items under the obj pushed to one side. Pushing all of them to the left or all
+        of them to the right only touches the items up to the nearest free spaces, and if one of both costs no more
+        than the lower bound of the costs, which never overestimates, no search can find anything cheaper. On equal
+        costs the left is taken like the search does.
+
+        :param input_arr: the input_arr to make space in, it is not modified
+        :return: a copy of the input_arr with the obj inserted and the costs, or None if a search is necessary
+        """
+        obj_end = self.obj_pos + self.obj_width
+        if obj_end > len(input_arr):
+            return None
+        lower_bound = sum(1 for pos in range(self.obj_pos, obj_end) if not input_arr.is_free(pos, None))
+        # A free space is taken by the search right away
+        if lower_bound == 0:
+            return None
+
+        last = obj_end - 1
+        while input_arr.is_free(last, None):
+            last -= 1
+        first = self.obj_pos
+        while input_arr.is_free(first, None):
+            first += 1
+        _, end = input_arr.item_span(last)
+        start, _ = input_arr.item_span(first)
+        free_sides: tuple[int, int] | None = None
+        for to_left, pos, steps in ((True, last, end - self.obj_pos), (False, first, obj_end - start)):
+            # The pushed item alone already moves steps spaces, so only a push of no more steps than the lower bound
+            # can be taken. Such a push leaves all free spaces under the obj behind the pushed items, so it needs as
+            # many free spaces on its side of the obj, which is decided before copying anything.
+            if steps > lower_bound:
+                continue
+            if free_sides is None:
+                free_sides = input_arr.calc_free(self.obj_width, self.obj_pos)
+            if free_sides[0 if to_left else 1] < steps:
+                continue
+            arr = input_arr.copy()
+            cost = arr.shift_left(pos, steps) if to_left else arr.shift_right(pos, steps)
+            if cost <= lower_bound:
+                arr.add_item(self.obj_name, self.obj_width, self.obj_pos)
+                if self.stats is not None:
+                    self.stats.fast_paths += 1
+                return arr, cost
+        return None
+
+    def _pack_around(self, input_arr: ArrayWrapper) -> tuple[ArrayWrapper, int] | None:
+        """
+        Makes space for the obj without searching, by pushing the items in front of the obj to the left and the items
+        behind it to the right as far as necessary. Every item under the obj is tried as the first one to be pushed
+        right and the cheapest of these layouts is taken.
+
+        :param input_arr: the input_arr to make space in, it is not modified
+        :return: a copy of the input_arr with the obj inserted and the costs, or None if the obj does not fit
+        """
+        values = input_arr.to_list()
+        length = len(values)
+        items: list[tuple[str, int, int]] = []
+        pos = 0
+        while pos < length:
+            name = values[pos]
+            end = pos + 1
+            while end < length and values[end] == name:
+                end += 1
+            if name is not None and name != self.obj_name:
+                items.append((name, pos, end - pos))
+            pos = end
+
+        total_width = sum(width for _, _, width in items)
+        if total_width + self.obj_width > length:
+            return None
+
+        obj_end = self.obj_pos + self.obj_width
+        first_split = sum(1 for _, start, width in items if start + width <= self.obj_pos)
+        last_split = sum(1 for _, start, _ in items if start < obj_end)
+        left_width = sum(width for _, _, width in items[:first_split])
+
+        best: tuple[int, int, list[int]] | None = None
+        for split in range(first_split, last_split + 1):
+            # Keep the obj as close to its desired position as the items on both sides allow
+            obj_pos = min(max(self.obj_pos, left_width), length - self.obj_width - (total_width - left_width))
+            cost = 2 * abs(obj_pos - self.obj_pos)
+            starts = [start for _, start, _ in items]
+            limit = obj_pos
+            for index in range(split - 1, -1, -1):
+                _, start, width = items[index]
+                if start + width <= limit:
+                    break
+                starts[index] = limit - width
+                cost += start - starts[index]
+                limit = starts[index]
+            limit = obj_pos + self.obj_width
+            for index in range(split, len(items)):
+                _, start, width = items[index]
+                if start >= limit:
+                    break
+                starts[index] = limit
+                cost += limit - start
+                limit += width
+            if best is None or cost < best[0]:
+                best = cost, obj_pos, starts
+            if split < len(items):
+                left_width += items[split][2]
+
+        cost, obj_pos, starts = best
+        result: list[str | None] = [None] * length
+        for (name, _, width), start in zip(items, starts):
+            result[start:start + width] = [name] * width
+        result[obj_pos:obj_pos + self.obj_width] = [self.obj_name] * self.obj_width
+
+        arr = input_arr.like(result)
+        if input_arr.moves is not None:
+            arr.moves = input_arr.moves.copy()
+            for (name, old_start, _), new_start in zip(items, starts):
+                if new_start != old_start:
+                    arr._record_move(name, old_start, new_start)
+            arr._record_move(self.obj_name, -1, obj_pos)
+        return arr, cost
+
 
 class ArrayWrapper:
+    __slots__ = ('arr', 'moves', 'shared', '_state_hash')
+
     def __init__(self, arr: list[str | None]):
         """
         The ArrayWrapper is a wrapper around a list of strings or None values.
@@ -171,6 +1183,13 @@ class ArrayWrapper:
         :param arr: the underlying array to wrap
         """
         self.arr = arr
+        # If not None every moved item is noted with its original and its current starting position
+        self.moves: dict[str, tuple[int, int]] | None = None
+        # Copies share the underlying array until one of them is modified, then the modified one makes its own copy
+        self.shared = False
+        # The xor of the zobrist_key() of all items, calculated once it is needed and then kept up to date by every
+        # modification
+        self._state_hash: int | None = None
 
     def __len__(self) -> int:
         """
@@ -182,11 +1201,90 @@ class ArrayWrapper:
 
     def copy(self) -> ArrayWrapper:
         """
-        Creates a copy of itself.
+        Creates a copy of itself. The copy shares the underlying array with itself until either of them is modified.
+
+        :return: the underlying array wrapped in a new ArrayWrapper
+        """
+        new_arr = ArrayWrapper.__new__(ArrayWrapper)
+        new_arr.arr = self.arr
+        new_arr.moves = self.moves.copy() if self.moves is not None else None
+        new_arr.shared = self.shared = True
+        new_arr._state_hash = self._state_hash
+        return new_arr
+
+    @property
+    def state_hash(self) -> int:
+        """
+        Gets the hash of the row, a cheap key for the configuration of the row. Rows with different hashes are always
+        different, rows with the same hash are the same unless two 64-bit keys collide.
+
+        :return: the xor of the zobrist_key() of all items
+        """
+        if self._state_hash is None:
+            self._state_hash = self._full_hash()
+        return self._state_hash
+
+    def _full_hash(self) -> int:
+        """
+        Calculates the hash of the row from scratch.
+
+        :return: the xor of the zobrist_key() of all items
+        """
+        state_hash = 0
+        previous = None
+        for pos, val in enumerate(self.arr):
+            if val is not None and val != previous:
+                state_hash ^= zobrist_key(val, pos)
+            previous = val
+        return state_hash
+
+    def _detach(self) -> None:
+        """
+        Gives itself its own copy of the underlying array before it gets modified.
+        """
+        self.arr = self.arr[:]
+        self.shared = False
+
+    def blank(self) -> ArrayWrapper:
+        """
+        Creates an empty array of the same length and kind as itself.
+
+        :return: a new ArrayWrapper of the same length that only contains None values
+        """
+        return ArrayWrapper([None for _ in range(len(self.arr))])
+
+    def to_list(self) -> list[str | None]:
+        """
+        Creates a list of the names (or None values) in the underlying array.
+
+        :return: a copy of the underlying array as a list
+        """
+        return self.arr.copy()
+
+    def like(self, arr: list[str | None]) -> ArrayWrapper:
+        """
+        Wraps the list into the same kind of array as itself.
+
+        :param arr: the list of names (or None values)
+        :return: the list wrapped in a new ArrayWrapper
+        """
+        return ArrayWrapper(arr)
+
+    def to_runs(self) -> list[tuple[str | None, int]]:
+        """
+        Creates a compact description of the array, in which every item and every stretch of free spaces is a single
+        entry. runs_to_list() turns it back into a list.
 
-        :return: a copy of the underlying array wrapped in a new ArrayWrapper
+        :return: the name (or None) and the length of every run of equal values from left to right
         """
-        return ArrayWrapper(self.arr.copy())
+        values = self.to_list()
+        runs: list[tuple[str | None, int]] = []
+        start = 0
+        for pos in range(1, len(values) + 1):
+            if pos == len(values) or values[pos] != values[start]:
+                runs.append((values[start], pos - start))
+                start = pos
+        return runs
 
     def index(self, value) -> int:
         """
@@ -197,14 +1295,23 @@ class ArrayWrapper:
         """
         return self.arr.index(value)
 
+    def state_key(self) -> Hashable:
+        """
+        Creates a hashable snapshot of the underlying array.
+
+        :return: a key that is equal for all arrays with the same configuration
+        """
+        return tuple(self.arr)
+
     def equal(self, other: ArrayWrapper) -> bool:
         """
-        Compares its underlying array with another ArrayWrapper's underlying array.
+        Compares its underlying array with another ArrayWrapper's underlying array. Arrays with different hashes
+        can not be the same, so only arrays with the same hash are compared.
 
         :param other: the other ArrayWrapper
         :return: If the arrays are the same
         """
-        return self.arr == other.arr
+        return self.arr is other.arr or (self.state_hash == other.state_hash and self.arr == other.arr)
 
     def is_free(self, target, name: str) -> bool:
         """
@@ -225,8 +1332,14 @@ class ArrayWrapper:
         :param obj_pos: the starting position of the object to add
         """
         if name not in self.arr:
+            if self.shared:
+                self._detach()
             for offset in range(obj_width):
                 self.arr[obj_pos + offset] = name
+            if self._state_hash is not None:
+                self._state_hash ^= zobrist_key(name, obj_pos)
+            if self.moves is not None:
+                self._record_move(name, -1, obj_pos)
 
     def free_spaces(self) -> int:
         """
@@ -236,6 +1349,43 @@ class ArrayWrapper:
         """
         return sum([1 if var is None else 0 for var in self.arr])
 
+    def free_runs(self) -> Iterator[tuple[int, int]]:
+        """
+        Iterates over the stretches of consecutive free spaces from left to right.
+
+        :return: the start and the length of every stretch of free spaces
+        """
+        start = -1
+        for pos, var in enumerate(self.arr):
+            if var is None:
+                if start < 0:
+                    start = pos
+            elif start >= 0:
+                yield start, pos - start
+                start = -1
+        if start >= 0:
+            yield start, len(self.arr) - start
+
+    def largest_free_run(self) -> int:
+        """
+        Calculates the length of the longest stretch of consecutive free spaces.
+
+        :return: the length of the longest stretch of free spaces (0 if there are no free spaces)
+        """
+        return max((length for _, length in self.free_runs()), default=0)
+
+    def first_free_run(self, width: int) -> int:
+        """
+        Finds the first stretch of consecutive free spaces the given width fits into.
+
+        :param width: the width that has to fit
+        :return: the start of the first fitting stretch of free spaces, or -1 if there is none
+        """
+        for start, length in self.free_runs():
+            if length >= width:
+                return start
+        return -1
+
     def all_free(self, name: str, obj_width: int, obj_pos: int) -> bool:
         """
         Checks if the spaces below the object are all free (or already occupied by the object itself).
@@ -288,6 +1438,61 @@ class ArrayWrapper:
             return 1
         return 0
 
+    def item_span(self, pos: int) -> tuple[int, int]:
+        """
+        Finds the combined item pointed to.
+
+        :param pos: the position inside the item
+        :return: the starting position of the item and the position right after its end
+        """
+        name = self.arr[pos]
+        start = pos
+        while start > 0 and self.arr[start - 1] == name:
+            start -= 1
+        end = pos + 1
+        while end < len(self.arr) and self.arr[end] == name:
+            end += 1
+        return start, end
+
+    def shift_left(self, pos: int, steps: int) -> int:
+        """
+        Finds the combined item pointed to and moves it, together with all items between it and the free spaces it
+        needs, steps spaces over to the left in a single pass. The outcome is the same as calling move_left() steps
+        times.
+
+        :param pos: the position from which the check for continuity should start
+        :param steps: the amount of spaces to move the item
+        :return: The incurred cost of the move, every moved item costs the distance it moved
+        """
+        if self.shared:
+            self._detach()
+        _, end = self.item_span(pos)
+        hole = end
+        found = 0
+        while found < steps:
+            hole -= 1
+            if hole < 0:
+                raise ValueError("not enough free spaces on the left side")
+            if self.arr[hole] is None:
+                found += 1
+
+        cost = 0
+        free = 0
+        previous = None
+        for offset, val in enumerate(self.arr[hole:end]):
+            if val is None:
+                free += 1
+            elif val != previous:
+                cost += free
+                if free and self._state_hash is not None:
+                    self._state_hash ^= zobrist_key(val, hole + offset) ^ zobrist_key(val, hole + offset - free)
+                if self.moves is not None:
+                    self._record_move(val, hole + offset, hole + offset - free)
+            previous = val
+
+        self.arr[hole:end] = [val for val in self.arr[hole:end] if val is not None] + [None] * steps
+        return cost
+
     def move_left(self, pos: int) -> int:
         """
         Finds the combined item pointed to, splits the part of and moves it over to the left.
@@ -295,17 +1500,7 @@ class ArrayWrapper:
         :param pos: the position from which the check for continuity should start
         :return: The incurred cost of the move
         """
-        name = self.arr[pos]
-        while self.arr[pos] == name:
-            pos += 1
-            if pos >= len(self.arr):
-                pos = len(self.arr)
-                break
-
-        sub_part = list(reversed(self.arr[:pos]))
-        sub_part.remove(None)
-        sub_part = list(reversed(sub_part)) + [None]
-        return self.calc_cost(sub_part + self.arr[pos:])
+        return self.shift_left(pos, 1)
 
     def move_left_copy(self, pos: int) -> tuple[ArrayWrapper, int]:
         """
@@ -318,6 +1513,46 @@ class ArrayWrapper:
         cost = new_arr.move_left(pos)
         return new_arr, cost
 
+    def shift_right(self, pos: int, steps: int) -> int:
+        """
+        Finds the combined item pointed to and moves it, together with all items between it and the free spaces it
+        needs, steps spaces over to the right in a single pass. The outcome is the same as calling move_right() steps
+        times.
+
+        :param pos: the position from which the check for continuity should start
+        :param steps: the amount of spaces to move the item
+        :return: The incurred cost of the move, every moved item costs the distance it moved
+        """
+        if self.shared:
+            self._detach()
+        start, _ = self.item_span(pos)
+        hole = start - 1
+        found = 0
+        while found < steps:
+            hole += 1
+            if hole >= len(self.arr):
+                raise ValueError("not enough free spaces on the right side")
+            if self.arr[hole] is None:
+                found += 1
+
+        cost = 0
+        free = 0
+        previous = None
+        for offset, val in enumerate(self.arr[start:hole + 1]):
+            if val is None:
+                free += 1
+            elif val != previous:
+                cost += steps - free
+                if steps - free and self._state_hash is not None:
+                    self._state_hash ^= (zobrist_key(val, start + offset)
+                                         ^ zobrist_key(val, start + offset + steps - free))
+                if self.moves is not None:
+                    self._record_move(val, start + offset, start + offset + steps - free)
+            previous = val
+
+        self.arr[start:hole + 1] = [None] * steps + [val for val in self.arr[start:hole + 1] if val is not None]
+        return cost
+
     def move_right(self, pos: int) -> int:
         """
         Finds the combined item pointed to, splits the part of and moves it over to the right.
@@ -325,17 +1560,7 @@ class ArrayWrapper:
         :param pos: the position from which the check for continuity should start
         :return: The incurred cost of the move
         """
-        name = self.arr[pos]
-        while self.arr[pos] == name:
-            pos -= 1
-            if pos < 0:
-                pos = -1
-                break
-
-        sub_part = self.arr[pos + 1:]
-        sub_part.remove(None)
-        sub_part = [None] + sub_part
-        return self.calc_cost(self.arr[:pos + 1] + sub_part)
+        return self.shift_right(pos, 1)
 
     def move_right_copy(self, pos: int) -> tuple[ArrayWrapper, int]:
         """
@@ -360,8 +1585,42 @@ class ArrayWrapper:
             if new_array[pos] is not None and self.arr[pos] != new_array[pos]:
                 cost += 1
         self.arr = new_array
+        self.shared = False
+        self._state_hash = None
         return cost
 
+    def _record_move(self, name: str, old_start: int, new_start: int) -> None:
+        """
+        Notes the new starting position of a moved item in the move log, keeping its original starting position.
+
+        :param name: the name of the moved item
+        :param old_start: the starting position of the item before the move (-1 for newly added items)
+        :param new_start: the starting position of the item after the move
+        """
+        recorded = self.moves.get(name)
+        self.moves[name] = (old_start if recorded is None else recorded[0], new_start)
+
+    def take_changes(self) -> dict[str, int]:
+        """
+        Stops recording moves and returns all items that ended up at a different starting position.
+
+        :return: a dictionary of items that have moved and what starting position the item has now
+        """
+        moves = self.moves or {}
+        self.moves = None
+        return {name: new_start for name, (old_start, new_start) in moves.items() if old_start != new_start}
+
+    def adopt(self, new_array: ArrayWrapper) -> None:
+        """
+        Overwrites its internal array with that of the passed ArrayWrapper.
+
+        :param new_array: the ArrayWrapper to take the array from
+        """
+        self.arr = new_array.arr
+        self.shared = new_array.shared = True
+        self._state_hash = new_array._state_hash
+        self.moves = None
+
     def change_objects(self, new_array: ArrayWrapper) -> dict[str, int]:
         """
         Takes in the new ArrayWrapper, compares it to itself and notes all the items that have moved then overwrites
@@ -379,21 +1638,76 @@ class ArrayWrapper:
             result.pop(None)
 
         self.arr = new_array.arr
+        self.shared = new_array.shared = True
+        self._state_hash = new_array._state_hash
         return result
 
-    def insert_and_return_changes(self, obj_name: str, obj_width: int, obj_pos: int) -> tuple[bool, dict[str, int]]:
+    def count_moved(self, new_array: ArrayWrapper) -> int:
+        """
+        Counts its items that start at a different position in the new ArrayWrapper, without noting which ones.
+
+        :param new_array: the new ArrayWrapper to which it compares itself
+        :return: the amount of its items that have moved
+        """
+        moved = 0
+        previous = None
+        for pos, name in enumerate(self.arr):
+            if name is not None and name != previous:
+                if new_array.arr[pos] != name or (pos > 0 and new_array.arr[pos - 1] == name):
+                    moved += 1
+            previous = name
+        return moved
+
+    def insert_and_return_changes(self, obj_name: str, obj_width: int, obj_pos: int,
+                                  time_budget: float | None = None, stats: SolverStats | None = None,
+                                  pool: Executor | None = None, cache: ResultCache | None = None,
+                                  engine: str = ENGINE_DFS) -> tuple[bool, dict[str, int]]:
         """
         Tries to insert the given object into itself. If it fails do nothing, otherwise insert the item.
 
         :param obj_name: the object's name
         :param obj_width: the width of the object
         :param obj_pos: the starting position of the object
-        :return: If the insertion was successfully and if it was also a dictionary of changes generated by the
-                 change_objects function.
+        :param time_budget: the time in seconds the search may take (None for no limit)
+        :param stats: collects statistics about the search if given
+        :param pool: a process pool that explores the branches of the search on wide rows in parallel (None to search
+                     everything in this process)
+        :param cache: remembers the results of earlier searches, so inserting the same item into the same array again
+                      is skipped (None to always search)
+        :param engine: the search to use, either ENGINE_DFS, ENGINE_BEST_FIRST or ENGINE_ITERATIVE
+        :return: If the insertion was successfully and if it was also a dictionary of the items that have moved and
+                 what starting position the item has now
         """
-        if sum([1 if val is None else 0 for val in self.arr]) < obj_width:
+        if self.free_spaces() < obj_width:
             return False, {}
-        return True, self.change_objects(SortInventory(obj_name, obj_width, obj_pos, self.copy()).sort_inventory())
+        new_array, changes = SortInventory(obj_name, obj_width, obj_pos, self.copy(), engine=engine, stats=stats,
+                                             pool=pool, cache=cache) \
+            .sort_inventory_with_changes(time_budget)
+        self.adopt(new_array)
+        return True, changes
+
+    def placement_cost(self, obj_name: str, obj_width: int, obj_pos: int, time_budget: float | None = None,
+                       stats: SolverStats | None = None, pool: Executor | None = None,
+                       cache: ResultCache | None = None, engine: str = ENGINE_DFS) -> tuple[bool, int, int, bool]:
+        """
+        Calculates what inserting the given object into itself would cost, without inserting it.
+
+        :param obj_name: the object's name
+        :param obj_width: the width of the object
+        :param obj_pos: the starting position of the object
+        :param time_budget: the time in seconds the search may take (None for no limit)
+        :param stats: collects statistics about the search if given
+        :param pool: a process pool that explores the branches of the search on wide rows in parallel (None to search
+                     everything in this process)
+        :param cache: remembers the results of earlier searches (None to always search)
+        :param engine: the search to use, either ENGINE_DFS, ENGINE_BEST_FIRST or ENGINE_ITERATIVE
+        :return: If the object fits, the costs of inserting it, the amount of items that would move and if the costs
+                 are proven to be the lowest possible
+        """
+        if self.free_spaces() < obj_width:
+            return False, 0, 0, True
+        return SortInventory(obj_name, obj_width, obj_pos, self.copy(), engine=engine, stats=stats, pool=pool,
+                             cache=cache).evaluate(time_budget)
 
     def remove_item(self, obj_name: str) -> int:
         """
@@ -403,7 +1717,11 @@ class ArrayWrapper:
         :return: the amount of spaces the object occupied before removal
         """
         count = self.arr.count(obj_name)
-        self.arr = [val if val != obj_name else None for val in self.arr]
+        if count:
+            if self._state_hash is not None:
+                self._state_hash ^= zobrist_key(obj_name, self.arr.index(obj_name))
+            self.arr = [val if val != obj_name else None for val in self.arr]
+            self.shared = False
         return count
 
     def fully_covered(self, name, obj_width: int, obj_pos: int) -> bool:
@@ -445,3 +1763,1483 @@ class ArrayWrapper:
             sum_width += self.remove_item(name)
             covered = item_covered
         return result, sum_width
+
+
+class NameTable:
+    __slots__ = ('ids', 'names')
+
+    def __init__(self, names: list[str] | None = None):
+        """
+        The NameTable assigns every item name a small integer id, so arrays can store the ids instead of the names.
+        The id 0 is reserved for free spaces (None).
+
+        :param names: the distinct names known from the start, they get the ids from 1 on in their order
+        """
+        self.names: list[str | None] = [None]
+        if names is not None:
+            self.names += names
+        self.ids: dict[str, int] = {name: name_id for name_id, name in enumerate(self.names) if name is not None}
+
+    def __len__(self) -> int:
+        """
+        Calls the len function on the known names.
+
+        :return: the amount of known names including the None value
+        """
+        return len(self.names)
+
+    def id_of(self, name: str | None) -> int:
+        """
+        Gets the id of the name, if the name is not known yet it is assigned the next free id.
+
+        :param name: the name for which to get the id
+        :return: the id of the name
+        """
+        if name is None:
+            return 0
+        name_id = self.ids.get(name)
+        if name_id is None:
+            name_id = len(self.names)
+            self.ids[name] = name_id
+            self.names.append(name)
+        return name_id
+
+    def lookup(self, name: str | None) -> int:
+        """
+        Gets the id of the name without assigning a new one.
+
+        :param name: the name for which to get the id
+        :return: the id of the name or -1 if the name is not known
+        """
+        if name is None:
+            return 0
+        return self.ids.get(name, -1)
+
+    def name_of(self, name_id: int) -> str | None:
+        """
+        Gets the name belonging to the id.
+
+        :param name_id: the id for which to get the name
+        :return: the name of the id
+        """
+        return self.names[name_id]
+
+    def forget(self, name: str) -> None:
+        """
+        Takes the id of the name back if it was the last one assigned, so a name that was only looked at does not keep
+        an id. No array may carry the id anymore.
+
+        :param name: the name whose id to take back
+        """
+        if self.names[-1] == name:
+            self.names.pop()
+            del self.ids[name]
+
+    @property
+    def typecode(self) -> str:
+        """
+        Gets the array type code that can hold every assigned id.
+
+        :return: 'H' as long as all ids fit into two bytes, 'I' afterwards
+        """
+        return 'H' if len(self.names) <= ID_LIMIT_SHORT else 'I'
+
+
+class CodedArrayWrapper(ArrayWrapper):
+    __slots__ = ('names',)
+
+    def __init__(self, arr: list[str | None] | array, names: NameTable | None = None):
+        """
+        The CodedArrayWrapper offers the same operations as the ArrayWrapper, but stores small integer ids in a
+        compact array('H') instead of a list of strings. All copies share the same NameTable, so copying and comparing
+        only has to handle the plain buffer. Once the NameTable has assigned more ids than fit into an array('H'), the
+        rows that need one of the larger ids switch to an array('I').
+
+        :param arr: the underlying array to wrap, either a list of names or an array('H') or array('I') of ids
+        :param names: the table that translates between names and ids
+        """
+        self.names = names if names is not None else NameTable()
+        if isinstance(arr, list):
+            ids = [self.names.id_of(name) for name in arr]
+            arr = array(self.names.typecode, ids)
+        self.arr = arr
+        self.moves: dict[str, tuple[int, int]] | None = None
+        self.shared = False
+        self._state_hash: int | None = None
+
+    def copy(self) -> CodedArrayWrapper:
+        """
+        Creates a copy of itself. The copy shares the underlying array with itself until either of them is modified.
+
+        :return: the underlying array wrapped in a new CodedArrayWrapper
+        """
+        new_arr = CodedArrayWrapper.__new__(CodedArrayWrapper)
+        new_arr.names = self.names
+        new_arr.arr = self.arr
+        new_arr.moves = self.moves.copy() if self.moves is not None else None
+        new_arr.shared = self.shared = True
+        new_arr._state_hash = self._state_hash
+        return new_arr
+
+    def _full_hash(self) -> int:
+        """
+        Calculates the hash of the row from scratch, the items are keyed by their id.
+
+        :return: the xor of the zobrist_key() of all items
+        """
+        state_hash = 0
+        previous = 0
+        for pos, value in enumerate(self.arr):
+            if value and value != previous:
+                state_hash ^= zobrist_key(value, pos)
+            previous = value
+        return state_hash
+
+    def blank(self) -> CodedArrayWrapper:
+        """
+        Creates an empty array of the same length as itself sharing the same NameTable.
+
+        :return: a new CodedArrayWrapper of the same length that only contains free spaces
+        """
+        return CodedArrayWrapper(array(self.arr.typecode, bytes(self.arr.itemsize * len(self.arr))), self.names)
+
+    def to_list(self) -> list[str | None]:
+        """
+        Translates the ids of the underlying array back into names.
+
+        :return: the underlying array as a list of names (or None values)
+        """
+        names = self.names.names
+        return [names[name_id] for name_id in self.arr]
+
+    def like(self, arr: list[str | None]) -> CodedArrayWrapper:
+        """
+        Wraps the list into a CodedArrayWrapper sharing its NameTable.
+
+        :param arr: the list of names (or None values)
+        :return: the list wrapped in a new CodedArrayWrapper
+        """
+        return CodedArrayWrapper(arr, self.names)
+
+    def index(self, value) -> int:
+        """
+        Calls the index function on the underlying array with the id of the value.
+
+        :param value: the value for which to get the index
+        :return: the index of the value
+        """
+        name_id = self.names.lookup(value)
+        if name_id < 0:
+            raise ValueError(f"{value!r} is not in array")
+        return self.arr.index(name_id)
+
+    def state_key(self) -> Hashable:
+        """
+        Creates a hashable snapshot of the underlying array. The ids only mean something together with the
+        NameTable, so the key contains the NameTable and the size of the ids as well.
+
+        :return: a key that is equal for all arrays with the same configuration and NameTable
+        """
+        return self.names, self.arr.typecode, self.arr.tobytes()
+
+    def is_free(self, target, name: str) -> bool:
+        """
+        Checks if the targeted space is free or the given name.
+
+        :param target: the position to check
+        :param name: the name that is also allowed as an option at the target position
+        :return: If the space is free or occupied by the name
+        """
+        value = self.arr[target]
+        return value == 0 or value == self.names.lookup(name)
+
+    def add_item(self, name: str, obj_width: int, obj_pos: int) -> None:
+        """
+        Adds the id of the name on all the necessary spaces if it is not already present in the array.
+
+        :param name: the value to add
+        :param obj_width: the width of the object to add
+        :param obj_pos: the starting position of the object to add
+        """
+        name_id = self.names.id_of(name)
+        if name_id not in self.arr:
+            if name_id >= ID_LIMIT_SHORT and self.arr.typecode == 'H':
+                # The widened copy is not shared with anyone
+                self.arr = array('I', self.arr)
+                self.shared = False
+            elif self.shared:
+                self._detach()
+            self.arr[obj_pos:obj_pos + obj_width] = array(self.arr.typecode, [name_id]) * obj_width
+            if self._state_hash is not None:
+                self._state_hash ^= zobrist_key(name_id, obj_pos)
+            if self.moves is not None:
+                self._record_move(name, -1, obj_pos)
+
+    def free_spaces(self) -> int:
+        """
+        Calculates the amount of free spaces.
+
+        :return: The amount of free spaces in the underlying array
+        """
+        return self.arr.count(0)
+
+    def free_runs(self) -> Iterator[tuple[int, int]]:
+        """
+        Iterates over the stretches of consecutive free spaces from left to right.
+
+        :return: the start and the length of every stretch of free spaces
+        """
+        start = -1
+        for pos, value in enumerate(self.arr):
+            if value == 0:
+                if start < 0:
+                    start = pos
+            elif start >= 0:
+                yield start, pos - start
+                start = -1
+        if start >= 0:
+            yield start, len(self.arr) - start
+
+    def all_free(self, name: str, obj_width: int, obj_pos: int) -> bool:
+        """
+        Checks if the spaces below the object are all free (or already occupied by the object itself).
+
+        :param name: the name of the object
+        :param obj_width: the width of the object
+        :param obj_pos: the starting position of the object
+        :return: If the spaces that are to be taken by the object are free or occupied by the object
+        """
+        part = self.arr[obj_pos:obj_pos + obj_width]
+        free = part.count(0)
+        name_id = self.names.lookup(name)
+        if name_id > 0:
+            free += part.count(name_id)
+        return free == obj_width
+
+    def calc_free(self, obj_width: int, obj_pos: int) -> tuple[int, int]:
+        """
+        Calculates the free spaces on both sides of the object.
+
+        :param obj_width: the width of the object
+        :param obj_pos: the starting position of the object
+        :return: the amount of spaces that are free on the left side of the object and the amount of spaces
+                 that are free on the right side of the object
+        """
+        return self.arr[:obj_pos].count(0), self.arr[obj_pos + obj_width:].count(0)
+
+    def check_allowed_move_directions(self, obj_pos: int, obj_width: int, target: int) -> int:
+        """
+        Checks the targeted positions object and what directions it is allowed to move to.
+
+        :param obj_pos: the starting position of the object
+        :param obj_width: the width of the object
+        :param target: the target space where the object that needs to move is positioned
+        :return: 0 if the targeted object can move both directions, 1 if the target is only allowed to move right,
+                 -1 if the target is only allowed to move left.
+        """
+        if target == 0:
+            return 1
+        if target == len(self.arr) - 1:
+            return -1
+
+        left_val = self.arr[obj_pos - 1] if obj_pos != 0 else 0
+        right_val = self.arr[obj_pos + obj_width] if obj_pos + obj_width != len(self.arr) else 0
+
+        value = self.arr[target]
+        if value == left_val == right_val:
+            return 0
+        if value == left_val:
+            return -1
+        if value == right_val:
+            return 1
+        return 0
+
+    def item_span(self, pos: int) -> tuple[int, int]:
+        """
+        Finds the combined item pointed to.
+
+        :param pos: the position inside the item
+        :return: the starting position of the item and the position right after its end
+        """
+        arr = self.arr
+        name_id = arr[pos]
+        start = pos
+        while start > 0 and arr[start - 1] == name_id:
+            start -= 1
+        end = pos + 1
+        while end < len(arr) and arr[end] == name_id:
+            end += 1
+        return start, end
+
+    def shift_left(self, pos: int, steps: int) -> int:
+        """
+        Finds the combined item pointed to and moves it, together with all items between it and the free spaces it
+        needs, steps spaces over to the left in a single pass. The outcome is the same as calling move_left() steps
+        times.
+
+        :param pos: the position from which the check for continuity should start
+        :param steps: the amount of spaces to move the item
+        :return: The incurred cost of the move, every moved item costs the distance it moved
+        """
+        if self.shared:
+            self._detach()
+        arr = self.arr
+        _, end = self.item_span(pos)
+        hole = end
+        found = 0
+        while found < steps:
+            hole -= 1
+            if hole < 0:
+                raise ValueError("not enough free spaces on the left side")
+            if arr[hole] == 0:
+                found += 1
+
+        cost = 0
+        free = 0
+        previous = 0
+        for offset, value in enumerate(arr[hole:end]):
+            if value == 0:
+                free += 1
+            elif value != previous:
+                cost += free
+                if free and self._state_hash is not None:
+                    self._state_hash ^= zobrist_key(value, hole + offset) ^ zobrist_key(value, hole + offset - free)
+                if self.moves is not None:
+                    self._record_move(self.names.name_of(value), hole + offset, hole + offset - free)
+            previous = value
+
+        moved = array(arr.typecode, [value for value in arr[hole:end] if value])
+        arr[hole:end] = moved + array(arr.typecode, bytes(arr.itemsize * steps))
+        return cost
+
+    def shift_right(self, pos: int, steps: int) -> int:
+        """
+        Finds the combined item pointed to and moves it, together with all items between it and the free spaces it
+        needs, steps spaces over to the right in a single pass. The outcome is the same as calling move_right() steps
+        times.
+
+        :param pos: the position from which the check for continuity should start
+        :param steps: the amount of spaces to move the item
+        :return: The incurred cost of the move, every moved item costs the distance it moved
+        """
+        if self.shared:
+            self._detach()
+        arr = self.arr
+        start, _ = self.item_span(pos)
+        hole = start - 1
+        found = 0
+        while found < steps:
+            hole += 1
+            if hole >= len(arr):
+                raise ValueError("not enough free spaces on the right side")
+            if arr[hole] == 0:
+                found += 1
+
+        cost = 0
+        free = 0
+        previous = 0
+        for offset, value in enumerate(arr[start:hole + 1]):
+            if value == 0:
+                free += 1
+            elif value != previous:
+                cost += steps - free
+                if steps - free and self._state_hash is not None:
+                    self._state_hash ^= (zobrist_key(value, start + offset)
+                                         ^ zobrist_key(value, start + offset + steps - free))
+                if self.moves is not None:
+                    self._record_move(self.names.name_of(value), start + offset, start + offset + steps - free)
+            previous = value
+
+        moved = array(arr.typecode, [value for value in arr[start:hole + 1] if value])
+        arr[start:hole + 1] = array(arr.typecode, bytes(arr.itemsize * steps)) + moved
+        return cost
+
+    def move_left(self, pos: int) -> int:
+        """
+        Finds the combined item pointed to, splits the part of and moves it over to the left.
+
+        :param pos: the position from which the check for continuity should start
+        :return: The incurred cost of the move
+        """
+        return self.shift_left(pos, 1)
+
+    def move_right(self, pos: int) -> int:
+        """
+        Finds the combined item pointed to, splits the part of and moves it over to the right.
+
+        :param pos: the position from which the check for continuity should start
+        :return: The incurred cost of the move
+        """
+        return self.shift_right(pos, 1)
+
+    def calc_cost(self, new_array: array) -> int:
+        """
+        Compares itself to the new array to calculate the costs then overwrites itself with the new array.
+
+        :param new_array: the new array of ids to check against and overwrite itself with
+        :return: the move cost calculated
+        """
+        cost = 0
+        for old, new in zip(self.arr, new_array):
+            if new != 0 and old != new:
+                cost += 1
+        self.arr = new_array
+        self.shared = False
+        self._state_hash = None
+        return cost
+
+    def change_objects(self, new_array: CodedArrayWrapper) -> dict[str, int]:
+        """
+        Takes in the new CodedArrayWrapper, compares it to itself and notes all the items that have moved then
+        overwrites its internal array with that of the passed CodedArrayWrapper.
+
+        :param new_array: the new CodedArrayWrapper to which it compares itself
+        :return: a dictionary of items that have moved and what starting position the item has now
+        """
+        result: dict[str, int] = {}
+        seen: set[int] = {0}
+        for old, new in zip(self.arr, new_array.arr):
+            if new not in seen and old != new:
+                seen.add(new)
+                result[self.names.name_of(new)] = new_array.arr.index(new)
+
+        self.arr = new_array.arr
+        self.shared = new_array.shared = True
+        self._state_hash = new_array._state_hash
+        return result
+
+    def count_moved(self, new_array: CodedArrayWrapper) -> int:
+        """
+        Counts its items that start at a different position in the new CodedArrayWrapper, without noting which ones.
+
+        :param new_array: the new CodedArrayWrapper to which it compares itself
+        :return: the amount of its items that have moved
+        """
+        old_arr = self.arr
+        new_arr = new_array.arr
+        moved = 0
+        previous = 0
+        for pos, name_id in enumerate(old_arr):
+            if name_id != 0 and name_id != previous:
+                if new_arr[pos] != name_id or (pos > 0 and new_arr[pos - 1] == name_id):
+                    moved += 1
+            previous = name_id
+        return moved
+
+    def placement_cost(self, obj_name: str, obj_width: int, obj_pos: int, time_budget: float | None = None,
+                       stats: SolverStats | None = None, pool: Executor | None = None,
+                       cache: ResultCache | None = None, engine: str = ENGINE_DFS) -> tuple[bool, int, int, bool]:
+        """
+        Calculates what inserting the given object into itself would cost, without inserting it. An object whose name
+        was not known to the NameTable before does not keep the id it was given for the search.
+
+        :param obj_name: the object's name
+        :param obj_width: the width of the object
+        :param obj_pos: the starting position of the object
+        :param time_budget: the time in seconds the search may take (None for no limit)
+        :param stats: collects statistics about the search if given
+        :param pool: a process pool that explores the branches of the search on wide rows in parallel (None to search
+                     everything in this process)
+        :param cache: remembers the results of earlier searches (None to always search)
+        :param engine: the search to use, either ENGINE_DFS, ENGINE_BEST_FIRST or ENGINE_ITERATIVE
+        :return: If the object fits, the costs of inserting it, the amount of items that would move and if the costs
+                 are proven to be the lowest possible
+        """
+        known = self.names.lookup(obj_name) >= 0
+        try:
+            return super().placement_cost(obj_name, obj_width, obj_pos, time_budget, stats, pool, cache, engine)
+        finally:
+            if not known:
+                self.names.forget(obj_name)
+
+    def remove_item(self, obj_name: str) -> int:
+        """
+        Removes the given object.
+
+        :param obj_name: the object's name to removes
+        :return: the amount of spaces the object occupied before removal
+        """
+        name_id = self.names.lookup(obj_name)
+        if name_id <= 0:
+            return 0
+        count = self.arr.count(name_id)
+        if count:
+            if self.shared:
+                self._detach()
+            start = self.arr.index(name_id)
+            if self._state_hash is not None:
+                self._state_hash ^= zobrist_key(name_id, start)
+            self.arr[start:start + count] = array(self.arr.typecode, bytes(self.arr.itemsize * count))
+        return count
+
+    def fully_covered(self, name, obj_width: int, obj_pos: int) -> bool:
+        """
+        Checks if the given object covers the given name fully.
+
+        :param name: the name for which to check for
+        :param obj_width: the width of the object
+        :param obj_pos: the starting position of the object
+        :return: If the object covers the name fully
+        """
+        name_id = self.names.lookup(name)
+        return self.arr.count(name_id) == self.arr[obj_pos:obj_pos + obj_width].count(name_id)
+
+    def remove_items_under_new_item(self, obj_width: int, obj_pos: int) -> tuple[dict[str, int], int]:
+        """
+        First tries to remove all items fully covered and if that doesn't make enough space, removes all items that
+        are blocking the object's position.
+
+        :param obj_width: the width of the object
+        :param obj_pos: the starting position of the object
+        :return: The objects that were removed and their length, as well as their summed length
+        """
+        free_spaces = self.free_spaces()
+        ids = set(self.arr[obj_pos:obj_pos + obj_width])
+        ids.discard(0)
+
+        sized_normed = sorted([(self.fully_covered(self.names.name_of(name_id), obj_width, obj_pos),
+                                self.arr.count(name_id),
+                                self.arr.index(name_id), self.names.name_of(name_id)) for name_id in ids],
+                              key=lambda x: (-x[0], x[1], x[2]))
+
+        result: dict[str, int] = {}
+        sum_width = 0
+        covered = True
+        for item_covered, size, start, name in sized_normed:
+            if covered and free_spaces + sum_width >= obj_width:
+                break
+            result[name] = size
+            sum_width += self.remove_item(name)
+            covered = item_covered
+        return result, sum_width
+
+
+class FenwickTree:
+    __slots__ = ('tree',)
+
+    def __init__(self, values: list[int]):
+        """
+        The FenwickTree (binary indexed tree) stores a list of numbers and allows to update single values and to
+        query prefix sums in O(log n).
+
+        :param values: the initial values
+        """
+        tree = [0] + values
+        for index in range(1, len(tree)):
+            parent = index + (index & -index)
+            if parent < len(tree):
+                tree[parent] += tree[index]
+        self.tree = tree
+
+    def __len__(self) -> int:
+        """
+        Gets the amount of stored values.
+
+        :return: the amount of values in the tree
+        """
+        return len(self.tree) - 1
+
+    def copy(self) -> FenwickTree:
+        """
+        Creates a copy of itself.
+
+        :return: a new FenwickTree with the same values
+        """
+        new_tree = FenwickTree.__new__(FenwickTree)
+        new_tree.tree = self.tree.copy()
+        return new_tree
+
+    def add(self, pos: int, delta: int) -> None:
+        """
+        Adds the delta to the value at the position.
+
+        :param pos: the position of the value to change
+        :param delta: the amount to add
+        """
+        pos += 1
+        while pos < len(self.tree):
+            self.tree[pos] += delta
+            pos += pos & -pos
+
+    def prefix(self, pos: int) -> int:
+        """
+        Calculates the sum of all values before the position.
+
+        :param pos: the exclusive end of the summed range
+        :return: the sum of the values in [0, pos)
+        """
+        result = 0
+        while pos > 0:
+            result += self.tree[pos]
+            pos -= pos & -pos
+        return result
+
+    def find(self, count: int) -> int:
+        """
+        Finds the smallest position for which the sum of all values up to and including it reaches the count.
+        For values that are either 0 or 1 this is the position of the count-th 1.
+
+        :param count: the sum to reach (at least 1)
+        :return: the found position or the length of the tree if the sum is never reached
+        """
+        pos = 0
+        step = 1 << (len(self.tree) - 1).bit_length()
+        while step:
+            next_pos = pos + step
+            if next_pos < len(self.tree) and self.tree[next_pos] < count:
+                pos = next_pos
+                count -= self.tree[next_pos]
+            step >>= 1
+        return pos
+
+
+class IntervalArrayWrapper(ArrayWrapper):
+    __slots__ = ('length', 'starts', 'widths', 'names', 'positions', 'free')
+
+    def __init__(self, arr: list[str | None]):
+        """
+        The IntervalArrayWrapper offers the same operations as the ArrayWrapper, but stores the items as sorted
+        (start, width, name) intervals together with a FenwickTree over the free spaces. Counting free spaces on
+        either side of a position and checking if a range is free take O(log n), which suits wide rows.
+
+        :param arr: the list of names (or None values) to build the intervals from
+        """
+        self.length = len(arr)
+        self.starts: list[int] = []
+        self.widths: list[int] = []
+        self.names: list[str] = []
+        self.positions: dict[str, int] = {}
+        pos = 0
+        while pos < len(arr):
+            name = arr[pos]
+            end = pos + 1
+            while end < len(arr) and arr[end] == name:
+                end += 1
+            if name is not None:
+                self.starts.append(pos)
+                self.widths.append(end - pos)
+                self.names.append(name)
+                self.positions[name] = pos
+            pos = end
+        self.free = FenwickTree([1 if name is None else 0 for name in arr])
+        self.moves: dict[str, tuple[int, int]] | None = None
+        self.shared = False
+        self._state_hash: int | None = None
+
+    def __len__(self) -> int:
+        """
+        Gets the length of the represented array.
+
+        :return: the length of the array
+        """
+        return self.length
+
+    def copy(self) -> IntervalArrayWrapper:
+        """
+        Creates a copy of itself. The copy shares the intervals and free spaces with itself until either of them is
+        modified.
+
+        :return: the intervals and free spaces wrapped in a new IntervalArrayWrapper
+        """
+        new_arr = IntervalArrayWrapper.__new__(IntervalArrayWrapper)
+        new_arr.length = self.length
+        new_arr.starts = self.starts
+        new_arr.widths = self.widths
+        new_arr.names = self.names
+        new_arr.positions = self.positions
+        new_arr.free = self.free
+        new_arr.moves = self.moves.copy() if self.moves is not None else None
+        new_arr.shared = self.shared = True
+        new_arr._state_hash = self._state_hash
+        return new_arr
+
+    def _full_hash(self) -> int:
+        """
+        Calculates the hash of the row from scratch.
+
+        :return: the xor of the zobrist_key() of all items
+        """
+        state_hash = 0
+        for start, name in zip(self.starts, self.names):
+            state_hash ^= zobrist_key(name, start)
+        return state_hash
+
+    def _detach(self) -> None:
+        """
+        Gives itself its own copy of the intervals and free spaces before they get modified.
+        """
+        self.starts = self.starts.copy()
+        self.widths = self.widths.copy()
+        self.names = self.names.copy()
+        self.positions = self.positions.copy()
+        self.free = self.free.copy()
+        self.shared = False
+
+    def blank(self) -> IntervalArrayWrapper:
+        """
+        Creates an empty array of the same length as itself.
+
+        :return: a new IntervalArrayWrapper of the same length without any items
+        """
+        return IntervalArrayWrapper([None for _ in range(self.length)])
+
+    def to_list(self) -> list[str | None]:
+        """
+        Expands the intervals into a list of names and None values.
+
+        :return: the represented array as a list
+        """
+        result: list[str | None] = [None] * self.length
+        for start, width, name in zip(self.starts, self.widths, self.names):
+            result[start:start + width] = [name] * width
+        return result
+
+    def like(self, arr: list[str | None]) -> IntervalArrayWrapper:
+        """
+        Wraps the list into the same kind of array as itself.
+
+        :param arr: the list of names (or None values)
+        :return: the list wrapped in a new IntervalArrayWrapper
+        """
+        return IntervalArrayWrapper(arr)
+
+    def _item_at(self, pos: int) -> int:
+        """
+        Finds the interval that covers the position.
+
+        :param pos: the position to look up
+        :return: the index of the interval or -1 if the position is free
+        """
+        index = bisect_right(self.starts, pos) - 1
+        if index >= 0 and pos < self.starts[index] + self.widths[index]:
+            return index
+        return -1
+
+    def _value_at(self, pos: int) -> str | None:
+        """
+        Gets the name stored at the position.
+
+        :param pos: the position to look up
+        :return: the name at the position or None if it is free
+        """
+        index = self._item_at(pos)
+        return self.names[index] if index >= 0 else None
+
+    def index(self, value) -> int:
+        """
+        Finds the first position of the value.
+
+        :param value: the value for which to get the index
+        :return: the index of the value
+        """
+        if value is None:
+            pos = self.free.find(1)
+        else:
+            pos = self.positions.get(value, self.length)
+        if pos >= self.length:
+            raise ValueError(f"{value!r} is not in array")
+        return pos
+
+    def state_key(self) -> Hashable:
+        """
+        Creates a hashable snapshot of the intervals.
+
+        :return: a key that is equal for all arrays with the same configuration
+        """
+        return self.length, tuple(self.starts), tuple(self.widths), tuple(self.names)
+
+    def equal(self, other: IntervalArrayWrapper) -> bool:
+        """
+        Compares its intervals with another IntervalArrayWrapper's intervals.
+
+        :param other: the other IntervalArrayWrapper
+        :return: If the arrays are the same
+        """
+        return self.starts is other.starts or (self.state_hash == other.state_hash and self.starts == other.starts
+                                               and self.names == other.names)
+
+    def is_free(self, target, name: str) -> bool:
+        """
+        Checks if the targeted space is None or the given name.
+
+        :param target: the position to check
+        :param name: the name that is also allowed as an option at the target position
+        :return: If the space is free or occupied by the name
+        """
+        value = self._value_at(target)
+        return value is None or value == name
+
+    def add_item(self, name: str, obj_width: int, obj_pos: int) -> None:
+        """
+        Adds the interval of the name if it is not already present in the array.
+
+        :param name: the value to add
+        :param obj_width: the width of the object to add
+        :param obj_pos: the starting position of the object to add
+        """
+        if name in self.positions:
+            return
+        if self.shared:
+            self._detach()
+        index = bisect_right(self.starts, obj_pos)
+        self.starts.insert(index, obj_pos)
+        self.widths.insert(index, obj_width)
+        self.names.insert(index, name)
+        self.positions[name] = obj_pos
+        if self._state_hash is not None:
+            self._state_hash ^= zobrist_key(name, obj_pos)
+        for pos in range(obj_pos, obj_pos + obj_width):
+            self.free.add(pos, -1)
+        if self.moves is not None:
+            self._record_move(name, -1, obj_pos)
+
+    def free_spaces(self) -> int:
+        """
+        Calculates the amount of free spaces.
+
+        :return: The amount of free spaces in the array
+        """
+        return self.free.prefix(self.length)
+
+    def free_runs(self) -> Iterator[tuple[int, int]]:
+        """
+        Iterates over the stretches of consecutive free spaces from left to right, these are the gaps between the
+        intervals.
+
+        :return: the start and the length of every stretch of free spaces
+        """
+        end = 0
+        for start, width in zip(self.starts, self.widths):
+            if start > end:
+                yield end, start - end
+            end = start + width
+        if end < self.length:
+            yield end, self.length - end
+
+    def all_free(self, name: str, obj_width: int, obj_pos: int) -> bool:
+        """
+        Checks if the spaces below the object are all free (or already occupied by the object itself).
+
+        :param name: the name of the object
+        :param obj_width: the width of the object
+        :param obj_pos: the starting position of the object
+        :return: If the spaces that are to be taken by the object are free or occupied by the object
+        """
+        end = obj_pos + obj_width
+        if end > self.length:
+            return False
+        free = self.free.prefix(end) - self.free.prefix(obj_pos)
+        start = self.positions.get(name)
+        if start is not None:
+            item_end = start + self.widths[bisect_right(self.starts, start) - 1]
+            free += max(0, min(end, item_end) - max(obj_pos, start))
+        return free == obj_width
+
+    def calc_free(self, obj_width: int, obj_pos: int) -> tuple[int, int]:
+        """
+        Calculates the free spaces on both sides of the object.
+
+        :param obj_width: the width of the object
+        :param obj_pos: the starting position of the object
+        :return: the amount of spaces that are free on the left side of the object and the amount of spaces
+                 that are free on the right side of the object
+        """
+        total = self.free.prefix(self.length)
+        return self.free.prefix(min(obj_pos, self.length)), total - self.free.prefix(min(obj_pos + obj_width,
+                                                                                         self.length))
+
+    def check_allowed_move_directions(self, obj_pos: int, obj_width: int, target: int) -> int:
+        """
+        Checks the targeted positions object and what directions it is allowed to move to.
+
+        :param obj_pos: the starting position of the object
+        :param obj_width: the width of the object
+        :param target: the target space where the object that needs to move is positioned
+        :return: 0 if the targeted object can move both directions, 1 if the target is only allowed to move right,
+                 -1 if the target is only allowed to move left.
+        """
+        if target == 0:
+            return 1
+        if target == self.length - 1:
+            return -1
+
+        left_val = self._value_at(obj_pos - 1) if obj_pos != 0 else None
+        right_val = self._value_at(obj_pos + obj_width) if obj_pos + obj_width != self.length else None
+
+        value = self._value_at(target)
+        if value == left_val == right_val:
+            return 0
+        if value == left_val:
+            return -1
+        if value == right_val:
+            return 1
+        return 0
+
+    def item_span(self, pos: int) -> tuple[int, int]:
+        """
+        Finds the item pointed to.
+
+        :param pos: the position inside the item
+        :return: the starting position of the item and the position right after its end
+        """
+        index = self._item_at(pos)
+        if index < 0:
+            return pos, pos + 1
+        return self.starts[index], self.starts[index] + self.widths[index]
+
+    def shift_left(self, pos: int, steps: int) -> int:
+        """
+        Finds the item pointed to and moves it, together with all items between it and the free spaces it needs,
+        steps spaces over to the left in a single pass. The outcome is the same as calling move_left() steps times.
+
+        :param pos: the position of the item to move
+        :param steps: the amount of spaces to move the item
+        :return: The incurred cost of the move, every moved item costs the distance it moved
+        """
+        if self.shared:
+            self._detach()
+        index = self._item_at(pos)
+        if index < 0:
+            return 0
+        end = self.starts[index] + self.widths[index]
+        free_before = self.free.prefix(end)
+        if free_before < steps:
+            raise ValueError("not enough free spaces on the left side")
+        hole = self.free.find(free_before - steps + 1)
+
+        cost = 0
+        distance = 0
+        gap_start = hole
+        for moved in range(bisect_right(self.starts, hole), index + 1):
+            start = self.starts[moved]
+            for free_pos in range(gap_start, start):
+                self.free.add(free_pos, -1)
+            distance += start - gap_start
+            gap_start = start + self.widths[moved]
+            self.starts[moved] = start - distance
+            self.positions[self.names[moved]] = start - distance
+            if self._state_hash is not None:
+                self._state_hash ^= (zobrist_key(self.names[moved], start)
+                                     ^ zobrist_key(self.names[moved], start - distance))
+            cost += distance
+            if self.moves is not None:
+                self._record_move(self.names[moved], start, start - distance)
+        for free_pos in range(end - steps, end):
+            self.free.add(free_pos, 1)
+        return cost
+
+    def shift_right(self, pos: int, steps: int) -> int:
+        """
+        Finds the item pointed to and moves it, together with all items between it and the free spaces it needs,
+        steps spaces over to the right in a single pass. The outcome is the same as calling move_right() steps times.
+
+        :param pos: the position of the item to move
+        :param steps: the amount of spaces to move the item
+        :return: The incurred cost of the move, every moved item costs the distance it moved
+        """
+        if self.shared:
+            self._detach()
+        index = self._item_at(pos)
+        if index < 0:
+            return 0
+        start = self.starts[index]
+        free_before = self.free.prefix(start)
+        if self.free.prefix(self.length) - free_before < steps:
+            raise ValueError("not enough free spaces on the right side")
+        hole = self.free.find(free_before + steps)
+
+        cost = 0
+        distance = 0
+        gap_end = hole + 1
+        for moved in range(bisect_right(self.starts, hole) - 1, index - 1, -1):
+            item_end = self.starts[moved] + self.widths[moved]
+            for free_pos in range(item_end, gap_end):
+                self.free.add(free_pos, -1)
+            distance += gap_end - item_end
+            gap_end = self.starts[moved]
+            self.starts[moved] += distance
+            self.positions[self.names[moved]] += distance
+            if self._state_hash is not None:
+                self._state_hash ^= (zobrist_key(self.names[moved], gap_end)
+                                     ^ zobrist_key(self.names[moved], gap_end + distance))
+            cost += distance
+            if self.moves is not None:
+                self._record_move(self.names[moved], gap_end, gap_end + distance)
+        for free_pos in range(start, start + steps):
+            self.free.add(free_pos, 1)
+        return cost
+
+    def move_left(self, pos: int) -> int:
+        """
+        Finds the combined item pointed to, splits the part of and moves it over to the left.
+
+        :param pos: the position from which the check for continuity should start
+        :return: The incurred cost of the move
+        """
+        return self.shift_left(pos, 1)
+
+    def move_right(self, pos: int) -> int:
+        """
+        Finds the combined item pointed to, splits the part of and moves it over to the right.
+
+        :param pos: the position from which the check for continuity should start
+        :return: The incurred cost of the move
+        """
+        return self.shift_right(pos, 1)
+
+    def calc_cost(self, new_array: list[str | None]) -> int:
+        """
+        Compares itself to the new array to calculate the costs then overwrites itself with the new array.
+
+        :param new_array: the new array to check against and overwrite itself with
+        :return: the move cost calculated
+        """
+        cost = 0
+        for old, new in zip(self.to_list(), new_array):
+            if new is not None and old != new:
+                cost += 1
+        self.adopt(IntervalArrayWrapper(new_array))
+        self.shared = False
+        return cost
+
+    def adopt(self, new_array: IntervalArrayWrapper) -> None:
+        """
+        Overwrites its intervals with those of the passed IntervalArrayWrapper.
+
+        :param new_array: the IntervalArrayWrapper to take the intervals from
+        """
+        self.length = new_array.length
+        self.starts = new_array.starts
+        self.widths = new_array.widths
+        self.names = new_array.names
+        self.positions = new_array.positions
+        self.free = new_array.free
+        self.shared = new_array.shared = True
+        self._state_hash = new_array._state_hash
+        self.moves = None
+
+    def change_objects(self, new_array: IntervalArrayWrapper) -> dict[str, int]:
+        """
+        Takes in the new IntervalArrayWrapper, compares it to itself and notes all the items that have moved then
+        overwrites its intervals with those of the passed IntervalArrayWrapper.
+
+        :param new_array: the new IntervalArrayWrapper to which it compares itself
+        :return: a dictionary of items that have moved and what starting position the item has now
+        """
+        result = {name: start for name, start in new_array.positions.items() if self.positions.get(name) != start}
+        self.adopt(new_array)
+        return result
+
+    def count_moved(self, new_array: IntervalArrayWrapper) -> int:
+        """
+        Counts its items that start at a different position in the new IntervalArrayWrapper, without noting which
+        ones.
+
+        :param new_array: the new IntervalArrayWrapper to which it compares itself
+        :return: the amount of its items that have moved
+        """
+        new_positions = new_array.positions
+        return sum(1 for name, start in self.positions.items() if new_positions.get(name) != start)
+
+    def remove_item(self, obj_name: str) -> int:
+        """
+        Removes the given object.
+
+        :param obj_name: the object's name to removes
+        :return: the amount of spaces the object occupied before removal
+        """
+        if obj_name not in self.positions:
+            return 0
+        if self.shared:
+            self._detach()
+        start = self.positions.pop(obj_name)
+        if self._state_hash is not None:
+            self._state_hash ^= zobrist_key(obj_name, start)
+        index = bisect_right(self.starts, start) - 1
+        width = self.widths[index]
+        del self.starts[index]
+        del self.widths[index]
+        del self.names[index]
+        for pos in range(start, start + width):
+            self.free.add(pos, 1)
+        return width
+
+    def fully_covered(self, name, obj_width: int, obj_pos: int) -> bool:
+        """
+        Checks if the given object covers the given name fully.
+
+        :param name: the name for which to check for
+        :param obj_width: the width of the object
+        :param obj_pos: the starting position of the object
+        :return: If the object covers the name fully
+        """
+        start = self.positions.get(name)
+        if start is None:
+            return True
+        width = self.widths[bisect_right(self.starts, start) - 1]
+        return obj_pos <= start and start + width <= obj_pos + obj_width
+
+    def remove_items_under_new_item(self, obj_width: int, obj_pos: int) -> tuple[dict[str, int], int]:
+        """
+        First tries to remove all items fully covered and if that doesn't make enough space, removes all items that
+        are blocking the object's position.
+
+        :param obj_width: the width of the object
+        :param obj_pos: the starting position of the object
+        :return: The objects that were removed and their length, as well as their summed length
+        """
+        free_spaces = self.free_spaces()
+        index = max(0, bisect_right(self.starts, obj_pos) - 1)
+        blocking: list[tuple[bool, int, int, str]] = []
+        while index < len(self.starts) and self.starts[index] < obj_pos + obj_width:
+            start, width, name = self.starts[index], self.widths[index], self.names[index]
+            if start + width > obj_pos:
+                blocking.append((self.fully_covered(name, obj_width, obj_pos), width, start, name))
+            index += 1
+
+        sized_normed = sorted(blocking, key=lambda x: (-x[0], x[1], x[2]))
+
+        result: dict[str, int] = {}
+        sum_width = 0
+        covered = True
+        for item_covered, size, start, name in sized_normed:
+            if covered and free_spaces + sum_width >= obj_width:
+                break
+            result[name] = size
+            sum_width += self.remove_item(name)
+            covered = item_covered
+        return result, sum_width
+
+
+class RowGrid:
+    __slots__ = ('rows', 'owned')
+
+    def __init__(self, rows: list[ArrayWrapper]):
+        """
+        The RowGrid holds the rows of an inventory. Copying it only copies the list of rows, a row is copied the first
+        time it is written to through writable(), so an operation only pays for the rows it actually changes.
+
+        :param rows: the rows of the grid, the grid takes ownership of them
+        """
+        self.rows = rows
+        # The indices of the rows that are not shared with any other RowGrid
+        self.owned: set[int] = set(range(len(rows)))
+
+    def __len__(self) -> int:
+        """
+        Gets the amount of rows.
+
+        :return: the amount of rows in the grid
+        """
+        return len(self.rows)
+
+    def __getitem__(self, index: int) -> ArrayWrapper:
+        """
+        Gets a row for reading, it must not be modified.
+
+        :param index: the index of the row
+        :return: the row at the index
+        """
+        return self.rows[index]
+
+    def __iter__(self):
+        """
+        Iterates over the rows for reading, they must not be modified.
+
+        :return: an iterator over the rows
+        """
+        return iter(self.rows)
+
+    def copy(self) -> RowGrid:
+        """
+        Creates a copy of itself that shares all rows with itself until they are written to.
+
+        :return: a new RowGrid with the same rows
+        """
+        new_grid = RowGrid(self.rows.copy())
+        new_grid.owned = set()
+        self.owned = set()
+        return new_grid
+
+    def writable(self, index: int) -> ArrayWrapper:
+        """
+        Gets a row for writing, if the row is still shared with another RowGrid it is copied first.
+
+        :param index: the index of the row
+        :return: the row at the index, which can be modified
+        """
+        if index not in self.owned:
+            self.rows[index] = self.rows[index].copy()
+            self.owned.add(index)
+        return self.rows[index]
+
+
+class MaxSegmentTree:
+    __slots__ = ('length', 'size', 'tree')
+
+    def __init__(self, values: list[int]):
+        """
+        The MaxSegmentTree holds a list of non-negative values and finds the first value that is at least as big as a
+        given value in O(log n). Changing a value takes O(log n) as well.
+
+        :param values: the values to hold
+        """
+        self.length = len(values)
+        self.size = 1
+        while self.size < self.length:
+            self.size *= 2
+        # Every inner node holds the maximum of its two children, the unused leaves hold -1 so they never match
+        self.tree = [-1] * (2 * self.size)
+        self.tree[self.size:self.size + self.length] = values
+        for node in range(self.size - 1, 0, -1):
+            self.tree[node] = max(self.tree[2 * node], self.tree[2 * node + 1])
+
+    def __len__(self) -> int:
+        """
+        Gets the amount of values.
+
+        :return: the amount of values in the tree
+        """
+        return self.length
+
+    def __getitem__(self, index: int) -> int:
+        """
+        Gets a single value.
+
+        :param index: the index of the value
+        :return: the value at the index
+        """
+        return self.tree[self.size + index]
+
+    def __setitem__(self, index: int, value: int) -> None:
+        """
+        Changes a single value and updates the maxima above it.
+
+        :param index: the index of the value
+        :param value: the new value
+        """
+        node = self.size + index
+        self.tree[node] = value
+        node //= 2
+        while node:
+            self.tree[node] = max(self.tree[2 * node], self.tree[2 * node + 1])
+            node //= 2
+
+    def first_at_least(self, value: int) -> int:
+        """
+        Finds the first value that is at least as big as the given value.
+
+        :param value: the smallest acceptable value (at least 0)
+        :return: the index of the first such value, or -1 if there is none
+        """
+        if self.tree[1] < value:
+            return -1
+        node = 1
+        while node < self.size:
+            node = 2 * node if self.tree[2 * node] >= value else 2 * node + 1
+        return node - self.size
+
+
+class SearchFrame:
+    """
+    One call of SortInventory._sort_inventory() on the explicit stack of SortInventory._sort_iteratively().
+    """
+    __slots__ = ('phase', 'obj_pos', 'arr', 'cost', 'target', 'free_left', 'free_right', 'other_arr', 'other_cost')
+
+    # The phases a frame goes through, RESOLVED_* and MOVED_* wait for the result of a branch
+    ENTER = 0
+    NEXT_ROUND = 1
+    REORDER = 2
+    RESOLVED_RIGHT = 3
+    RESOLVED_LEFT = 4
+    MOVED_RIGHT = 5
+    MOVED_LEFT = 6
+
+    def __init__(self, obj_pos: int, arr: ArrayWrapper, cost: int):
+        """
+        :param obj_pos: the desired obj position
+        :param arr: the array of the state
+        :param cost: the already incurred costs from former operations on the array
+        """
+        self.phase = SearchFrame.ENTER
+        self.obj_pos = obj_pos
+        self.arr = arr
+        self.cost = cost
+        self.target = obj_pos
+        self.free_left = 0
+        self.free_right = 0
+        self.other_arr: ArrayWrapper | None = None
+        self.other_cost = 0
+
+
+class TranspositionTable:
+    def __init__(self, max_size: int = 2 ** 16):
+        """
+        The TranspositionTable remembers the lowest cost with which the search reached a configuration of the array
+        and the desired obj position. Different orders of moves often lead to the same configuration, the table
+        allows the search to only pursue the cheapest of them. The least recently used states are evicted once
+        max_size states are stored.
+
+        :param max_size: the maximum amount of states to remember
+        """
+        self.max_size = max_size
+        self.states: OrderedDict[tuple[Hashable, int], int] = OrderedDict()
+
+    def __len__(self) -> int:
+        """
+        Calls the len function on the stored states.
+
+        :return: the amount of stored states
+        """
+        return len(self.states)
+
+    def is_known(self, state: Hashable, obj_pos: int, cost: int) -> bool:
+        """
+        Checks if the state was already reached with the same or lower costs. If not the cost is stored as the new
+        best cost of the state.
+
+        :param state: the hashable configuration of the array
+        :param obj_pos: the current desired obj position
+        :param cost: the costs with which the state was reached
+        :return: If the state was already reached at least as cheaply
+        """
+        key = (state, obj_pos)
+        best = self.states.get(key)
+        if best is not None:
+            self.states.move_to_end(key)
+            if best <= cost:
+                return True
+        self.states[key] = cost
+        if len(self.states) > self.max_size:
+            self.states.popitem(last=False)
+        return False
+
+
+class ResultCache:
+    def __init__(self, max_size: int = 1024):
+        """
+        The ResultCache remembers the results of the last searches of SortInventory objects by the array they started
+        from and the inserted obj, so the same search does not have to run again. This happens often, when items are
+        dropped back at the same position or moved back and forth. The least recently used results are evicted once
+        max_size results are stored.
+
+        :param max_size: the maximum amount of results to remember
+        """
+        self.max_size = max_size
+        self.results: OrderedDict[Hashable, tuple[ArrayWrapper, dict[str, int] | None, int]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        """
+        Calls the len function on the stored results.
+
+        :return: the amount of stored results
+        """
+        return len(self.results)
+
+    def get(self, key: Hashable, record_moves: bool) -> tuple[ArrayWrapper, dict[str, int] | None, int] | None:
+        """
+        Looks up the result of a search.
+
+        :param key: the array the search started from and the inserted obj
+        :param record_moves: if the moved items are needed as well
+        :return: a copy of the resulting array, the moved items with their new starting position (None if they were
+                 not recorded) and the costs, or None if the result is not known
+        """
+        result = self.results.get(key)
+        if result is None or (record_moves and result[1] is None):
+            self.misses += 1
+            return None
+        self.results.move_to_end(key)
+        self.hits += 1
+        arr, changes, cost = result
+        return arr.copy(), dict(changes) if changes is not None else None, cost
+
+    def put(self, key: Hashable, arr: ArrayWrapper, changes: dict[str, int] | None, cost: int) -> None:
+        """
+        Remembers the result of a search.
+
+        :param key: the array the search started from and the inserted obj
+        :param arr: the resulting array, a copy of it is stored
+        :param changes: the moved items with their new starting position (None if they were not recorded)
+        :param cost: the costs of the result
+        """
+        self.results[key] = arr.copy(), dict(changes) if changes is not None else None, cost
+        self.results.move_to_end(key)
+        if len(self.results) > self.max_size:
+            self.results.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Forgets all results and resets the counters.
+        """
+        self.results.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+class SolverStats:
+    __slots__ = ('solves', 'nodes_expanded', 'sort_branches', 'resolve_branches', 'abandoned_cost',
+                 'abandoned_out_of_bounds', 'abandoned_equal', 'abandoned_known', 'abandoned_blocked', 'copies',
+                 'moves', 'cached', 'fast_paths', 'wall_time', 'on_solve')
+
+    def __init__(self, on_solve: Callable[[SortInventory, float], None] | None = None):
+        """
+        The SolverStats class collects statistics of every search of the SortInventory objects it is given to. The
+        counters add up over all searches until reset() is called. A SortInventory without a SolverStats does not
+        collect anything.
+
+        :param on_solve: called with the SortInventory and the wall time in seconds after every search, for example
+                         to log slow inputs (None to not be notified)
+        """
+        self.on_solve = on_solve
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Sets all counters back to zero.
+        """
+        # The amount of searches
+        self.solves = 0
+        self.nodes_expanded = 0
+        # Where _sort_inventory() tried moving the obj to both sides
+        self.sort_branches = 0
+        # Where _recursively_resolve_order() tried moving an item to both sides
+        self.resolve_branches = 0
+        # The abandoned versions of the array, split by the reason
+        self.abandoned_cost = 0
+        self.abandoned_out_of_bounds = 0
+        self.abandoned_equal = 0
+        self.abandoned_known = 0
+        self.abandoned_blocked = 0
+        # The copies of the array made to explore branches
+        self.copies = 0
+        # The items moved outside a branch
+        self.moves = 0
+        # The searches answered by a ResultCache and the searches that were not necessary, because pushing the items
+        # under the obj to one side was as cheap as possible
+        self.cached = 0
+        self.fast_paths = 0
+        self.wall_time = 0.0
+
+    def record_solve(self, solver: SortInventory, wall_time: float) -> None:
+        """
+        Adds the totals of a finished search.
+
+        :param solver: the SortInventory that finished its search
+        :param wall_time: the seconds the search took
+        """
+        self.solves += 1
+        self.nodes_expanded += solver.nodes_expanded
+        self.wall_time += wall_time
+        if self.on_solve is not None:
+            self.on_solve(solver, wall_time)
+
+    def as_dict(self) -> dict[str, int | float]:
+        """
+        Gets all counters, for example to log them.
+
+        :return: the counters by their name
+        """
+        return {name: getattr(self, name) for name in self.__slots__ if name != 'on_solve'}
@@ -0,0 +1,103 @@
+from sort import ArrayWrapper, CodedArrayWrapper, IntervalArrayWrapper, SortInventory, ENGINE_DFS, \
+    ENGINE_BEST_FIRST, ENGINE_ITERATIVE
+from random import Random
+import pytest
+
+BACKENDS = [ArrayWrapper, CodedArrayWrapper, IntervalArrayWrapper]
+
+
+def random_rows(seed: int, count: int, max_width: int = 16) -> list[tuple[list[str | None], int, int]]:
+    """
+    Creates random rows together with an obj that fits into their free spaces.
+
+    :param seed: the seed of the random numbers
+    :param count: the amount of rows
+    :param max_width: the largest width of a row
+    :return: every row with the width and the desired position of the obj
+    """
+    rng = Random(seed)
+    cases: list[tuple[list[str | None], int, int]] = []
+    while len(cases) < count:
+        width = rng.randint(4, max_width)
+        fill = rng.choice([0.4, 0.6, 0.8, 0.9])
+        row: list[str | None] = []
+        while len(row) < width:
+            if rng.random() > fill:
+                row.append(None)
+            else:
+                row += [f"I{len(row)}"] * rng.randint(1, 4)
+        row = row[:width]
+        obj_width = rng.randint(1, 4)
+        if row.count(None) >= obj_width:
+            cases.append((row, obj_width, rng.randint(0, width - obj_width)))
+    return cases
+
+
+def solve(row: list[str | None], obj_width: int, obj_pos: int, backend: type[ArrayWrapper] = ArrayWrapper,
+          engine: str = ENGINE_DFS) -> tuple[list[str | None], int, bool]:
+    """
+    Sorts the obj "N" into the row.
+
+    :param row: the row to sort the obj into
+    :param obj_width: the width of the obj
+    :param obj_pos: the desired position of the obj
+    :param backend: the ArrayWrapper implementation used for the row
+    :param engine: the search to use
+    :return: the sorted row, the costs and if the costs are proven to be the lowest
+    """
+    solver = SortInventory("N", obj_width, obj_pos, backend(row), engine=engine)
+    result = solver.sort_inventory()
+    return result.to_list(), solver.cost, solver.proven_optimal
+
+
+def check_layout(before: list[str | None], after: list[str | None], obj_width: int) -> None:
+    """
+    Checks that a sorted row still holds every item in one piece, in the same order and with the obj in it.
+
+    :param before: the row before sorting
+    :param after: the row after sorting
+    :param obj_width: the width of the obj
+    """
+    assert len(after) == len(before)
+    assert after.count("N") == obj_width
+    items = [name for index, name in enumerate(before) if name is not None and before[index - 1:index] != [name]]
+    placed = [name for index, name in enumerate(after) if name not in (None, "N") and after[index - 1:index] != [name]]
+    assert placed == items
+    for name in items:
+        assert after.count(name) == before.count(name)
+
+
+@pytest.mark.parametrize("backend", BACKENDS[1:])
+def test_backends_agree(backend: type[ArrayWrapper]):
+    for row, obj_width, obj_pos in random_rows(1, 150):
+        expected = solve(row, obj_width, obj_pos)
+        assert solve(row, obj_width, obj_pos, backend) == expected, (row, obj_width, obj_pos)
+
+
+def test_engines_agree():
+    for row, obj_width, obj_pos in random_rows(2, 150):
+        dfs_row, dfs_cost, dfs_proven = solve(row, obj_width, obj_pos)
+        check_layout(row, dfs_row, obj_width)
+        assert solve(row, obj_width, obj_pos, engine=ENGINE_ITERATIVE) == (dfs_row, dfs_cost, dfs_proven)
+        best_first_row, best_first_cost, best_first_proven = solve(row, obj_width, obj_pos, engine=ENGINE_BEST_FIRST)
+        check_layout(row, best_first_row, obj_width)
+        # The depth-first search is not always optimal and can get stuck, the best-first search never loses to it
+        assert best_first_proven
+        assert best_first_cost <= dfs_cost, (row, obj_width, obj_pos)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_changes_match_layout(backend: type[ArrayWrapper]):
+    for row, obj_width, obj_pos in random_rows(3, 50):
+        arr, changes = SortInventory("N", obj_width, obj_pos, backend(row)).sort_inventory_with_changes()
+        after = arr.to_list()
+        starts = {name: after.index(name) for name in set(after) - {None}}
+        assert changes == {name: start for name, start in starts.items() if name == "N" or row.index(name) != start}
+
+
+def test_known_costs():
+    assert solve([None, None, "A", None], 2, 0) == (["N", "N", "A", None], 0, True)
+    # Pushing A one space to the right is cheaper than moving the obj
+    assert solve(["A", None, None, None], 1, 0)[1] == 1
+    # Moving the obj costs 2 per space
+    assert solve(["A", "A", "A", None], 1, 2) == (["A", "A", "A", "N"], 2, True)